@@ -0,0 +1,115 @@
+# datagen.py
+# Deterministic synthetic data shaped like production: vehicles follow VEHICLE_CONFIG,
+# bookings pick 1-3 services valid for the vehicle type and are priced from SERVICE_PRICES.
+import json
+import random
+import sqlite3
+from datetime import datetime, timedelta
+from benchmarks.standin import StandInCursor
+from database.rollups import rebuild_rollups
+from screens.add_vehicle import VEHICLE_CONFIG
+from screens.book_service import SERVICE_PRICES
+
+STATUS_WEIGHTS = {"Completed": 0.55, "Pending": 0.2, "In Progress": 0.15, "Cancelled": 0.1}
+SERVICES_PER_USER = 8
+VEHICLES_PER_USER = 1.5
+MECHANICS = 25
+HISTORY_DAYS = 730
+BATCH_SIZE = 20000
+
+
+def parse_size(text):
+    """'1k' -> 1000, '100k' -> 100000, '1m' -> 1000000."""
+    text = text.strip().lower()
+    multiplier = {"k": 1_000, "m": 1_000_000}.get(text[-1], 1)
+    return int(float(text.rstrip("km")) * multiplier)
+
+
+def _batched(rows, size=BATCH_SIZE):
+    batch = []
+    for row in rows:
+        batch.append(row)
+        if len(batch) >= size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def seed(path, services, seed_value=42, now=None):
+    """Populate the stand-in database at path with the given number of services.
+
+    Users and vehicles scale with the service count. Returns the row counts written.
+    """
+    rng = random.Random(seed_value)
+    now = now or datetime(2025, 8, 1, 12, 0, 0)
+    users = max(10, services // SERVICES_PER_USER)
+    vehicles = max(users, int(users * VEHICLES_PER_USER))
+    statuses, status_weights = zip(*STATUS_WEIGHTS.items())
+
+    conn = sqlite3.connect(path)
+    conn.execute("PRAGMA synchronous=OFF")
+    try:
+        with conn:
+            conn.executemany(
+                "INSERT INTO mechanics (mechanic_id, mechanic_name, contact) VALUES (?, ?, ?)",
+                [(100 + i, f"Mechanic {i:02d}", f"98{i:08d}") for i in range(MECHANICS)]
+            )
+            conn.executemany(
+                "INSERT INTO users (id, full_name, email, phone, password, user_type) VALUES (?, ?, ?, ?, ?, ?)",
+                ((i, f"Customer {i}", f"customer{i}@example.com", f"9{i:09d}", "Passw0rd!",
+                  "Admin" if i == 1 else "Customer") for i in range(1, users + 1))
+            )
+
+            vehicle_rows = []
+            for vid in range(1, vehicles + 1):
+                user_id = vid if vid <= users else rng.randint(1, users)
+                vtype = rng.choice(list(VEHICLE_CONFIG))
+                brand = rng.choice(VEHICLE_CONFIG[vtype]["brands"])
+                model = rng.choice(VEHICLE_CONFIG[vtype]["models"][brand])
+                vehicle_rows.append((vid, user_id, vtype, brand, model, f"MP{vid % 90 + 10:02d}XX{vid:07d}"))
+            conn.executemany(
+                "INSERT INTO vehicles (vehicle_id, user_id, vehicle_type, vehicle_brand, vehicle_model, vehicle_no)"
+                " VALUES (?, ?, ?, ?, ?, ?)", vehicle_rows
+            )
+
+            line_items = 0
+            for batch in _batched(range(1, services + 1)):
+                service_rows, type_rows = [], []
+                for sid in batch:
+                    vehicle = vehicle_rows[rng.randrange(vehicles)]
+                    offered = VEHICLE_CONFIG[vehicle[2]]["services"]
+                    chosen = rng.sample(offered, rng.randint(1, min(3, len(offered))))
+                    base_cost = sum(SERVICE_PRICES.get(s, 0) for s in chosen)
+                    status = rng.choices(statuses, status_weights)[0]
+                    paid = status == "Completed" and rng.random() < 0.85
+                    extra = rng.choice((0, 0, 0, 50, 100, 250))
+                    requested = now - timedelta(seconds=rng.randrange(HISTORY_DAYS * 86400))
+                    service_rows.append((
+                        sid, vehicle[1], vehicle[0], json.dumps(chosen), "", "No", None,
+                        (requested + timedelta(days=rng.randint(0, 7))).date().isoformat(),
+                        status,
+                        100 + rng.randrange(MECHANICS) if status != "Pending" else None,
+                        "Done" if paid else "Pending",
+                        base_cost, extra, "", "",
+                        base_cost + extra if paid else 0,
+                        requested.strftime("%Y-%m-%d %H:%M:%S"),
+                    ))
+                    type_rows.extend((sid, s, SERVICE_PRICES.get(s, 0)) for s in chosen)
+                conn.executemany(
+                    "INSERT INTO services (service_id, customer_id, vehicle_id, service_types, description,"
+                    " pickup_required, pickup_address, service_date, status, assigned_mechanic,"
+                    " payment_status, base_cost, extra_charges, charge_description, work_done, Paid,"
+                    " request_date) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                    service_rows
+                )
+                conn.executemany(
+                    "INSERT INTO service_types (service_id, service_name, price) VALUES (?, ?, ?)", type_rows
+                )
+                line_items += len(type_rows)
+            rebuild_rollups(StandInCursor(conn.cursor()))
+        conn.execute("ANALYZE")
+    finally:
+        conn.close()
+    return {"users": users, "vehicles": vehicles, "mechanics": MECHANICS,
+            "services": services, "service_types": line_items}
@@ -0,0 +1,346 @@
+# loadtest.py
+# Headless load test: simulated users drive main.py through streamlit.testing.v1.AppTest
+# against a seeded stand-in database and report throughput, step latency and DB connections.
+#
+#   python -m benchmarks.loadtest --users 20 --duration 60 --admin-ratio 0.1 --out load.json
+#
+# AppTest swaps a process-wide Runtime singleton on every run, so it cannot drive several sessions
+# from threads of one process. Each simulated user therefore gets its own worker process, all
+# sharing one database file; connection counts are reported per worker (one app process each).
+import argparse
+import json
+import logging
+import multiprocessing
+import os
+import platform
+import random
+import sys
+import tempfile
+import threading
+import time
+from collections import defaultdict
+from datetime import datetime
+
+ADMIN_EMAIL = "customer1@example.com"
+PASSWORD = "Passw0rd!"
+STATUS_CYCLE = ["Pending", "In Progress", "Completed"]
+POOL_SAMPLE_INTERVAL = 0.005
+# Session._run uses AppTest internals (see its docstring), checked against this release only;
+# requirements.txt pins the same version. Re-check _run before moving the pin.
+SUPPORTED_STREAMLIT = "1.46."
+
+
+class StepFailed(Exception):
+    pass
+
+
+def _percentile(values, q):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(q * len(ordered)))] if ordered else 0.0
+
+
+def _find(elements, label, startswith=False):
+    for element in elements:
+        text = getattr(element, "label", "") or ""
+        if text == label or (startswith and text.startswith(label)):
+            return element
+    raise StepFailed(f"no element labelled {label!r}")
+
+
+def _check(at, ok, what):
+    if at.exception:
+        raise StepFailed(at.exception[0].message)
+    if not ok:
+        errors = "; ".join(str(e.value) for e in at.error)
+        raise StepFailed(f"{what}{': ' + errors if errors else ''}")
+
+
+class Session:
+    """One simulated browser tab; each step is a user action plus the reruns it triggers."""
+
+    def __init__(self, timeout):
+        from streamlit.testing.v1 import AppTest
+        self.at = AppTest.from_file("main.py", default_timeout=timeout)
+
+    def _run(self):
+        """Rerun with the current widget values, like the frontend does after an interaction.
+
+        After st.rerun() or a fragment rerun, AppTest's element tree still holds widgets from
+        the earlier pass whose state is gone. The public AppTest.run() raises KeyError on those
+        (the admin "Update Status" step always hits it), so this collects the states itself,
+        skips the stale widgets and calls the private AppTest._run. Both _tree and _run are
+        internal, hence SUPPORTED_STREAMLIT.
+        """
+        from streamlit.proto.WidgetStates_pb2 import WidgetStates
+        from streamlit.testing.v1.element_tree import get_widget_state
+        states = WidgetStates()
+        for node in self.at._tree:
+            try:
+                state = get_widget_state(node)
+            except KeyError:
+                continue
+            if state is not None:
+                states.widgets.append(state)
+        self.at._run(states)
+
+    def login(self, email):
+        at = self.at
+        at.run()
+        _find(at.button, "🚀 Get Started").click()
+        self._run()
+        at.text_input(key="email_input").input(email)
+        at.text_input(key="password_input").input(PASSWORD)
+        _find(at.button, "🚀 Sign In").click()
+        self._run()
+        _check(at, at.session_state["logged_in"], "login failed")
+
+    def add_vehicle(self, vehicle_no):
+        at = self.at
+        _find(at.text_input, "Vehicle Number").input(vehicle_no)
+        _find(at.button, "Add Vehicle").click()
+        self._run()
+        _check(at, at.session_state["sidebar_choice"] == "Book Service", "vehicle not added")
+
+    def book_service(self, vehicle_no):
+        at = self.at
+        vehicle = _find(at.selectbox, "Select Vehicle")
+        vehicle.select(next(o for o in vehicle.options if vehicle_no in o))
+        self._run()
+        services = _find(at.multiselect, "Select Service Types")
+        services.select(services.options[0])
+        _find(at.radio, "Pickup Required?").set_value("No")
+        _find(at.button, "Submit Service Request").click()
+        self._run()
+        _check(at, "booking_service_id" in at.session_state, "booking not created")
+
+    def pay(self):
+        at = self.at
+        _find(at.button, "💳 Pay", startswith=True).click()
+        self._run()
+        _check(at, "booking_service_id" not in at.session_state, "payment not recorded")
+
+    def admin_search(self, vehicle_prefix):
+        at = self.at
+        _find(at.text_input, "Vehicle Number Filter").input(vehicle_prefix)
+        self._run()
+        _check(at, not at.warning, "no services matched")
+
+    def admin_open_service(self):
+        at = self.at
+        _find(at.button, "👀 View Details", startswith=True).click()
+        self._run()
+        _check(at, at.session_state["current_service"], "service detail not opened")
+
+    def admin_update_status(self, rng):
+        at = self.at
+        status = _find(at.selectbox, "Service Status")
+        status.select(rng.choice([s for s in STATUS_CYCLE if s != status.value]))
+        _find(at.button, "Update Status").click()
+        self._run()
+        _check(at, not at.error, "status update failed")
+
+    def back_to_dashboard(self):
+        at = self.at
+        _find(at.button, "← Back").click()
+        self._run()
+        _check(at, not at.session_state["current_service"], "still on detail page")
+
+
+def customer_journey(session, worker, iteration, customers, rng, timed):
+    email = f"customer{rng.randint(2, customers)}@example.com"
+    vehicle_no = f"LT{worker:03d}{iteration:06d}"
+    timed("login", lambda: session.login(email))
+    timed("add_vehicle", lambda: session.add_vehicle(vehicle_no))
+    timed("book_service", lambda: session.book_service(vehicle_no))
+    timed("pay", session.pay)
+
+
+def admin_journey(session, worker, iteration, customers, rng, timed):
+    timed("admin_login", lambda: session.login(ADMIN_EMAIL))
+    # Seeded plates start MP10..MP99; load-test bookings (LT...) would reorder an unfiltered list.
+    # One-digit prefixes (MP1..MP9) match a tenth of the plates, so this month's page is rarely empty.
+    timed("admin_search", lambda: session.admin_search(f"MP{rng.randint(1, 9)}"))
+    timed("admin_open_service", session.admin_open_service)
+    timed("admin_update_status", lambda: session.admin_update_status(rng))
+    timed("admin_back", session.back_to_dashboard)
+
+
+def _sample_pool(stop, peaks):
+    from database.connection import db_manager
+    while not stop.wait(POOL_SAMPLE_INTERVAL):
+        stats = db_manager.pool_stats() or {}
+        peaks["size"] = max(peaks["size"], stats.get("size", 0))
+        peaks["in_use"] = max(peaks["in_use"], stats.get("in_use", 0))
+
+
+def worker_main(worker, args, db_path, customers, barrier, results):
+    """Run journeys until the deadline and put this worker's measurements on the results queue."""
+    if not args.verbose:
+        # AppTest re-applies Streamlit's log level on every run; silence its bare-mode warning directly.
+        logging.getLogger("streamlit.runtime.scriptrunner_utils.script_run_context").disabled = True
+        sys.stdout = open(os.devnull, "w")
+    from benchmarks import standin
+    from database.exception_handler import metrics
+    standin.install(db_path, max_connections=args.pool_size)
+    rng = random.Random(args.seed * 1000 + worker)
+    is_admin = worker < round(args.users * args.admin_ratio)
+    journey = admin_journey if is_admin else customer_journey
+    steps, errors, journeys = [], defaultdict(int), 0
+    peaks = {"size": 0, "in_use": 0}
+
+    def timed(name, fn):
+        start = time.perf_counter()
+        try:
+            fn()
+        except Exception as e:
+            errors[name] += 1
+            steps.append((name, (time.perf_counter() - start) * 1000, False))
+            if args.verbose:
+                print(f"[worker {worker}] {name}: {e}", file=sys.stderr)
+            raise StepFailed(name) from e
+        steps.append((name, (time.perf_counter() - start) * 1000, True))
+
+    barrier.wait()
+    stop = threading.Event()
+    sampler = threading.Thread(target=_sample_pool, args=(stop, peaks), daemon=True)
+    sampler.start()
+    deadline = time.monotonic() + args.duration
+    iteration = 0
+    while time.monotonic() < deadline:
+        iteration += 1
+        try:
+            journey(Session(args.timeout), worker, iteration, customers, rng, timed)
+            journeys += 1
+        except StepFailed:
+            pass
+        if args.think_time:
+            time.sleep(rng.uniform(0, 2 * args.think_time))
+    stop.set()
+    sampler.join()
+    results.put({
+        "worker": worker,
+        "role": "admin" if is_admin else "customer",
+        "journeys": journeys,
+        "steps": steps,
+        "errors": dict(errors),
+        "pool_peak": peaks,
+        "db_calls": sum(m["calls"] for m in metrics.snapshot()),
+    })
+
+
+def summarize(worker_results, duration):
+    by_step = defaultdict(list)
+    errors = defaultdict(int)
+    for result in worker_results:
+        for name, ms, ok in result["steps"]:
+            if ok:
+                by_step[name].append(ms)
+        for name, count in result["errors"].items():
+            errors[name] += count
+    journeys = sum(r["journeys"] for r in worker_results)
+    steps = sum(len(r["steps"]) for r in worker_results)
+    return {
+        "throughput": {
+            "journeys": journeys,
+            "journeys_per_s": round(journeys / duration, 2),
+            "steps_per_s": round(steps / duration, 2),
+            "db_calls_per_s": round(sum(r["db_calls"] for r in worker_results) / duration, 1),
+        },
+        "steps": [
+            {
+                "step": name,
+                "ok": len(timings),
+                "errors": errors.get(name, 0),
+                "p50_ms": round(_percentile(timings, 0.50), 1),
+                "p95_ms": round(_percentile(timings, 0.95), 1),
+                "p99_ms": round(_percentile(timings, 0.99), 1),
+                "max_ms": round(max(timings), 1) if timings else 0.0,
+            }
+            for name, timings in sorted(by_step.items())
+        ] + [
+            {"step": name, "ok": 0, "errors": count} for name, count in errors.items() if name not in by_step
+        ],
+        "db_connections": {
+            "peak_per_worker": max((r["pool_peak"]["size"] for r in worker_results), default=0),
+            "peak_in_use_per_worker": max((r["pool_peak"]["in_use"] for r in worker_results), default=0),
+            "peak_total": sum(r["pool_peak"]["size"] for r in worker_results),
+        },
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Load test main.py with simulated concurrent users.")
+    parser.add_argument("--users", type=int, default=10, help="concurrent simulated users (one process each)")
+    parser.add_argument("--duration", type=float, default=30, help="seconds of measured load")
+    parser.add_argument("--admin-ratio", type=float, default=0.1, help="share of users running the admin journey")
+    parser.add_argument("--think-time", type=float, default=0.0, help="mean pause between journeys, seconds")
+    parser.add_argument("--size", default="10k", help="services seeded before the run, e.g. 10k")
+    parser.add_argument("--pool-size", type=int, default=10, help="max DB connections per worker")
+    parser.add_argument("--timeout", type=float, default=30, help="AppTest per-run timeout, seconds")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--workdir", default=os.path.join(tempfile.gettempdir(), "motormates-load"))
+    parser.add_argument("--verbose", action="store_true", help="show app output and step failures")
+    parser.add_argument("--out", help="write JSON results here instead of stdout")
+    args = parser.parse_args(argv)
+
+    import streamlit
+    if not streamlit.__version__.startswith(SUPPORTED_STREAMLIT):
+        parser.error(f"streamlit {streamlit.__version__} is installed; Session._run relies on AppTest "
+                     f"internals only checked against {SUPPORTED_STREAMLIT}x")
+
+    from benchmarks import datagen, standin
+    os.makedirs(args.workdir, exist_ok=True)
+    db_path = os.path.join(args.workdir, f"load-{os.getpid()}.sqlite3")
+    size = datagen.parse_size(args.size)
+    standin.create_schema(db_path)
+    # Seed relative to now so the admin dashboard's default "this month" filter has rows.
+    counts = datagen.seed(db_path, size, seed_value=args.seed, now=datetime.now())
+    print(f"seeded {counts}; starting {args.users} users for {args.duration:.0f}s", file=sys.stderr)
+
+    ctx = multiprocessing.get_context("spawn")
+    barrier = ctx.Barrier(args.users + 1)
+    results = ctx.Queue()
+    workers = [
+        ctx.Process(target=worker_main, args=(i, args, db_path, counts["users"], barrier, results))
+        for i in range(args.users)
+    ]
+    try:
+        for w in workers:
+            w.start()
+        barrier.wait()  # every worker has imported the app and opened its pool
+        started = time.monotonic()
+        worker_results = [results.get() for _ in workers]
+        elapsed = time.monotonic() - started
+        for w in workers:
+            w.join()
+    finally:
+        for w in workers:
+            if w.is_alive():
+                w.terminate()
+        for suffix in ("", "-wal", "-shm"):
+            if os.path.exists(db_path + suffix):
+                os.remove(db_path + suffix)
+
+    report = {
+        "meta": {
+            "python": platform.python_version(),
+            "timestamp": datetime.now().isoformat(timespec="seconds"),
+            "users": args.users,
+            "admin_users": sum(r["role"] == "admin" for r in worker_results),
+            "duration_s": round(elapsed, 1),
+            "seeded": counts,
+            "pool_size": args.pool_size,
+            "backend": "sqlite-standin",
+        },
+        **summarize(worker_results, elapsed),
+    }
+    output = json.dumps(report, indent=2)
+    if args.out:
+        with open(args.out, "w") as f:
+            f.write(output)
+    else:
+        print(output)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,184 @@
+# run.py
+# Times the real database/* service methods against seeded stand-in databases.
+#
+#   python -m benchmarks.run --sizes 1k,100k,1m --repeat 5 --out bench.json
+#
+# Results are JSON keyed by (case, services) so runs from different commits can be diffed.
+import argparse
+import json
+import os
+import platform
+import random
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+from benchmarks import datagen, standin
+from database.cache import query_cache
+from database.mechanics import MechanicService
+from database.services import ServiceManager
+from database.users import UserService
+from database.vehicles import VehicleService
+
+# Cases that read the whole services table only run up to this size unless --full-scans is given.
+FULL_SCAN_LIMIT = 100_000
+SEED_NOW = datetime(2025, 8, 1, 12, 0, 0)
+
+
+def _rows(result):
+    if isinstance(result, tuple):
+        result = result[0]
+    if isinstance(result, (list, tuple)):
+        return len(result)
+    return int(result is not None)
+
+
+def _walk_pages(filters, pages, limit=50):
+    sm, cursor, rows = ServiceManager(), None, []
+    for _ in range(pages):
+        page, cursor = sm.query_services(filters, after_cursor=cursor, limit=limit)
+        rows.extend(page)
+        if cursor is None:
+            break
+    return rows
+
+
+def build_cases(counts, rng):
+    """(name, callable, full_scan) for every benchmarked call."""
+    month_start = (SEED_NOW - timedelta(days=30)).date()
+    today = SEED_NOW.date()
+    service_ids = [rng.randint(1, counts["services"]) for _ in range(64)]
+    user_ids = [rng.randint(2, counts["users"]) for _ in range(64)]
+    pick = lambda ids: ids[rng.randrange(len(ids))]
+    sm = ServiceManager()
+    return [
+        ("ServiceManager.fetch_all_services", sm.fetch_all_services, True),
+        ("ServiceManager.get_services_by_customer_id", lambda: sm.get_services_by_customer_id(pick(user_ids)), False),
+        ("ServiceManager.get_service", lambda: sm.get_service(pick(service_ids)), False),
+        ("ServiceManager.query_services[month]",
+         lambda: sm.query_services({"start_date": month_start, "end_date": today}), False),
+        ("ServiceManager.query_services[status+month]",
+         lambda: sm.query_services({"start_date": month_start, "end_date": today, "statuses": ["Pending"]}), False),
+        ("ServiceManager.query_services[vehicle prefix]",
+         lambda: sm.query_services({"vehicle_no_prefix": "MP42"}), False),
+        ("ServiceManager.query_services[10 pages, all]", lambda: _walk_pages({}, 10), False),
+        ("ServiceManager.count_services[month]",
+         lambda: sm.count_services({"start_date": month_start, "end_date": today}), False),
+        ("ServiceManager.get_statistics", sm.get_statistics, False),
+        ("ServiceManager.get_statistics[month]", lambda: sm.get_statistics((month_start, today)), False),
+        ("ServiceManager.query_customer_services",
+         lambda: sm.query_customer_services(pick(user_ids)), False),
+        ("UserService.get_user_by_email",
+         lambda: UserService().get_user_by_email(f"customer{pick(user_ids)}@example.com"), False),
+        ("UserService.get_session_user",
+         lambda: UserService().get_session_user(f"customer{pick(user_ids)}@example.com"), False),
+        ("UserService.fetch_all_users", UserService().fetch_all_users, True),
+        ("VehicleService.fetch_vehicles_by_user",
+         lambda: VehicleService().fetch_vehicles_by_user(pick(user_ids)), False),
+        ("MechanicService.fetch_all_mechanics", MechanicService().fetch_all_mechanics, False),
+    ]
+
+
+def time_case(fn, repeat, warm):
+    """Run fn repeat times; cold runs clear the shared query cache first."""
+    timings, rows = [], 0
+    for _ in range(repeat):
+        if not warm:
+            query_cache.clear()
+        start = time.perf_counter()
+        result = fn()
+        timings.append((time.perf_counter() - start) * 1000)
+        rows = _rows(result)
+    timings.sort()
+    return {
+        "runs": repeat,
+        "rows": rows,
+        "min_ms": round(timings[0], 3),
+        "median_ms": round(statistics.median(timings), 3),
+        "p95_ms": round(timings[min(len(timings) - 1, int(0.95 * len(timings)))], 3),
+        "max_ms": round(timings[-1], 3),
+    }
+
+
+def _git_revision():
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except Exception:
+        return None
+
+
+def prepare_database(size, workdir, seed_value):
+    """Seed (or reuse) the stand-in database for size services and install it."""
+    path = os.path.join(workdir, f"bench-{size}-seed{seed_value}.sqlite3")
+    counts_path = path + ".json"
+    if not (os.path.exists(path) and os.path.exists(counts_path)):
+        for stale in (path, counts_path):
+            if os.path.exists(stale):
+                os.remove(stale)
+        standin.create_schema(path)
+        start = time.perf_counter()
+        counts = datagen.seed(path, size, seed_value=seed_value, now=SEED_NOW)
+        print(f"  seeded {counts} in {time.perf_counter() - start:.1f}s", file=sys.stderr)
+        with open(counts_path, "w") as f:
+            json.dump(counts, f)
+    with open(counts_path) as f:
+        counts = json.load(f)
+    standin.install(path)
+    return counts
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark database methods on synthetic data.")
+    parser.add_argument("--sizes", default="1k,100k,1m", help="comma-separated service counts, e.g. 1k,100k,1m")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--workdir", default=os.path.join(tempfile.gettempdir(), "motormates-bench"),
+                        help="where seeded databases are cached between runs")
+    parser.add_argument("--only", default="", help="substring filter on case names")
+    parser.add_argument("--warm", action="store_true", help="keep the query cache between runs")
+    parser.add_argument("--full-scans", action="store_true",
+                        help=f"run whole-table cases above {FULL_SCAN_LIMIT:,} services too")
+    parser.add_argument("--out", help="write JSON results here instead of stdout")
+    args = parser.parse_args(argv)
+
+    os.makedirs(args.workdir, exist_ok=True)
+    report = {
+        "meta": {
+            "git_revision": _git_revision(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "timestamp": datetime.now().isoformat(timespec="seconds"),
+            "repeat": args.repeat,
+            "warm_cache": args.warm,
+            "backend": "sqlite-standin",
+        },
+        "results": [],
+    }
+    for size in [datagen.parse_size(s) for s in args.sizes.split(",") if s.strip()]:
+        print(f"[{size:,} services]", file=sys.stderr)
+        counts = prepare_database(size, args.workdir, args.seed)
+        rng = random.Random(args.seed)
+        for name, fn, full_scan in build_cases(counts, rng):
+            if args.only and args.only not in name:
+                continue
+            if full_scan and size > FULL_SCAN_LIMIT and not args.full_scans:
+                continue
+            result = time_case(fn, args.repeat, args.warm)
+            report["results"].append({"case": name, "services": size, **result})
+            print(f"  {name:<50} median {result['median_ms']:>10.2f} ms  rows {result['rows']}",
+                  file=sys.stderr)
+
+    output = json.dumps(report, indent=2, default=str)
+    if args.out:
+        with open(args.out, "w") as f:
+            f.write(output)
+    else:
+        print(output)
+
+
+if __name__ == "__main__":
+    main()
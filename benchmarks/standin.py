@@ -0,0 +1,212 @@
+# standin.py
+# SQLite stand-in for the MySQL database, speaking the subset of the pymysql API the app uses.
+import re
+import sqlite3
+from datetime import date, datetime
+from functools import partial
+from database.connection import ConnectionPool, db_manager
+
+# Mirrors database/schema.py plus the indexes and columns added by database/migrations.py.
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS users (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    full_name VARCHAR(100) NOT NULL COLLATE NOCASE,
+    email VARCHAR(100) NOT NULL UNIQUE COLLATE NOCASE,
+    phone VARCHAR(20) NOT NULL,
+    password VARCHAR(100) NOT NULL,
+    user_type VARCHAR(20) NOT NULL DEFAULT 'Customer'
+);
+CREATE TABLE IF NOT EXISTS vehicles (
+    vehicle_id INTEGER PRIMARY KEY AUTOINCREMENT,
+    user_id INT NOT NULL REFERENCES users(id) ON DELETE CASCADE,
+    vehicle_type VARCHAR(20),
+    vehicle_brand VARCHAR(100),
+    vehicle_model VARCHAR(100),
+    vehicle_no VARCHAR(30) UNIQUE COLLATE NOCASE
+);
+CREATE TABLE IF NOT EXISTS mechanics (
+    mechanic_id INTEGER PRIMARY KEY AUTOINCREMENT,
+    mechanic_name VARCHAR(100) NOT NULL,
+    contact VARCHAR(20)
+);
+CREATE TABLE IF NOT EXISTS services (
+    service_id INTEGER PRIMARY KEY AUTOINCREMENT,
+    customer_id INT NOT NULL REFERENCES users(id) ON DELETE CASCADE,
+    vehicle_id INT NOT NULL REFERENCES vehicles(vehicle_id) ON DELETE CASCADE,
+    service_types JSON,
+    description TEXT,
+    pickup_required VARCHAR(10),
+    pickup_address VARCHAR(250),
+    service_date DATE,
+    status VARCHAR(20) DEFAULT 'Pending',
+    assigned_mechanic INT REFERENCES mechanics(mechanic_id) ON DELETE SET NULL,
+    payment_status VARCHAR(20) DEFAULT 'Pending',
+    base_cost INT DEFAULT 0,
+    extra_charges INT DEFAULT 0,
+    charge_description TEXT,
+    work_done TEXT,
+    Paid INT DEFAULT 0,
+    request_date DATETIME DEFAULT CURRENT_TIMESTAMP,
+    updated_at DATETIME DEFAULT CURRENT_TIMESTAMP,
+    version INT NOT NULL DEFAULT 1
+);
+CREATE TABLE IF NOT EXISTS service_changes (
+    change_id INTEGER PRIMARY KEY AUTOINCREMENT,
+    service_id INT NOT NULL,
+    version INT NOT NULL,
+    changed_at DATETIME DEFAULT CURRENT_TIMESTAMP
+);
+CREATE TABLE IF NOT EXISTS service_types (
+    service_type_id INTEGER PRIMARY KEY AUTOINCREMENT,
+    service_id INT NOT NULL REFERENCES services(service_id) ON DELETE CASCADE,
+    service_name VARCHAR(100) NOT NULL,
+    price INT DEFAULT 0
+);
+CREATE TABLE IF NOT EXISTS daily_service_rollup (
+    day DATE NOT NULL,
+    status VARCHAR(20) NOT NULL,
+    vehicle_type VARCHAR(20) NOT NULL,
+    mechanic_id INT NOT NULL,
+    services INT NOT NULL,
+    billed BIGINT NOT NULL,
+    paid BIGINT NOT NULL,
+    PRIMARY KEY (day, status, vehicle_type, mechanic_id)
+);
+CREATE TABLE IF NOT EXISTS daily_service_type_rollup (
+    day DATE NOT NULL,
+    status VARCHAR(20) NOT NULL,
+    vehicle_type VARCHAR(20) NOT NULL,
+    mechanic_id INT NOT NULL,
+    service_name VARCHAR(100) NOT NULL,
+    services INT NOT NULL,
+    billed BIGINT NOT NULL,
+    paid BIGINT NOT NULL,
+    PRIMARY KEY (day, status, vehicle_type, mechanic_id, service_name)
+);
+CREATE INDEX IF NOT EXISTS idx_users_phone ON users (phone);
+CREATE INDEX IF NOT EXISTS idx_users_full_name ON users (full_name);
+CREATE INDEX IF NOT EXISTS idx_vehicles_user_sort
+    ON vehicles (user_id, vehicle_type, vehicle_brand, vehicle_model, vehicle_no);
+CREATE INDEX IF NOT EXISTS idx_services_request_date ON services (request_date);
+CREATE INDEX IF NOT EXISTS idx_services_status_request_date ON services (status, request_date);
+CREATE INDEX IF NOT EXISTS idx_services_payment_status_request_date ON services (payment_status, request_date);
+CREATE INDEX IF NOT EXISTS idx_services_customer_request_date ON services (customer_id, request_date);
+CREATE INDEX IF NOT EXISTS idx_services_vehicle ON services (vehicle_id);
+CREATE INDEX IF NOT EXISTS idx_services_service_date_status ON services (service_date, status);
+CREATE INDEX IF NOT EXISTS idx_service_types_service ON service_types (service_id);
+"""
+
+sqlite3.register_adapter(datetime, lambda v: v.strftime("%Y-%m-%d %H:%M:%S"))
+sqlite3.register_adapter(date, lambda v: v.isoformat())
+sqlite3.register_converter("DATETIME", lambda b: datetime.strptime(b.decode()[:19], "%Y-%m-%d %H:%M:%S"))
+sqlite3.register_converter("DATE", lambda b: date.fromisoformat(b.decode()[:10]))
+
+
+_UPSERT = re.compile(r"\s+AS\s+(\w+)\s+ON DUPLICATE KEY UPDATE\b", re.IGNORECASE)
+_FOR_UPDATE = re.compile(r"\s+FOR UPDATE\s*$", re.IGNORECASE)
+
+
+def _translate(sql):
+    """pymysql paramstyle and the MySQL-only clauses the app uses, in SQLite syntax."""
+    sql = _FOR_UPDATE.sub("", sql.replace("%s", "?"))
+    match = _UPSERT.search(sql)
+    if match:
+        # INSERT ... VALUES (...) AS new ON DUPLICATE KEY UPDATE c = c + new.c
+        update = re.sub(rf"\b{match.group(1)}\.", "excluded.", sql[match.end():])
+        sql = sql[:match.start()] + " ON CONFLICT DO UPDATE SET" + update
+    return sql
+
+
+class StandInCursor:
+    """DictCursor look-alike over a sqlite3 cursor."""
+
+    def __init__(self, raw):
+        self._raw = raw
+        self.rowcount = -1
+        self.lastrowid = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def _rows(self, rows):
+        names = [d[0] for d in self._raw.description or ()]
+        return [dict(zip(names, row)) for row in rows]
+
+    def execute(self, sql, params=()):
+        self._raw.execute(_translate(sql), tuple(params or ()))
+        self.rowcount = self._raw.rowcount
+        self.lastrowid = self._raw.lastrowid
+        return self.rowcount
+
+    def executemany(self, sql, seq_of_params):
+        self._raw.executemany(_translate(sql), [tuple(p) for p in seq_of_params])
+        self.rowcount = self._raw.rowcount
+        return self.rowcount
+
+    def fetchone(self):
+        row = self._raw.fetchone()
+        return self._rows([row])[0] if row is not None else None
+
+    def fetchmany(self, size=1000):
+        return self._rows(self._raw.fetchmany(size))
+
+    def fetchall(self):
+        return self._rows(self._raw.fetchall())
+
+    def close(self):
+        self._raw.close()
+
+
+class StandInConnection:
+    """Autocommit sqlite3 connection with the pymysql methods the app calls."""
+
+    def __init__(self, path):
+        self._conn = sqlite3.connect(
+            path, isolation_level=None, check_same_thread=False,
+            detect_types=sqlite3.PARSE_DECLTYPES, timeout=30
+        )
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA foreign_keys=ON")
+        self.open = True
+
+    def cursor(self, cursor_class=None):
+        return StandInCursor(self._conn.cursor())
+
+    def begin(self):
+        # SQLite has no row locks; take the write lock up front so reads inside the
+        # transaction stay consistent with its writes, as SELECT ... FOR UPDATE would.
+        self._conn.execute("BEGIN IMMEDIATE")
+
+    def commit(self):
+        if self._conn.in_transaction:
+            self._conn.execute("COMMIT")
+
+    def rollback(self):
+        if self._conn.in_transaction:
+            self._conn.execute("ROLLBACK")
+
+    def ping(self, reconnect=False):
+        self._conn.execute("SELECT 1")
+
+    def close(self):
+        self.open = False
+        self._conn.close()
+
+
+def create_schema(path):
+    conn = sqlite3.connect(path)
+    try:
+        conn.executescript(SCHEMA)
+    finally:
+        conn.close()
+
+
+def install(path, max_connections=10):
+    """Point database.connection.db_manager at the SQLite file at path."""
+    create_schema(path)
+    pool = ConnectionPool(partial(StandInConnection, path), min_size=1, max_size=max_connections)
+    db_manager.use_pool(pool)
+    return pool
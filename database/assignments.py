@@ -0,0 +1,112 @@
+# assignments.py
+# Balances pending services for a day across mechanics by estimated workload.
+import heapq
+from .cache import query_cache
+from .connection import db_manager
+from .exception_handler import db_exception_handler
+from .rollups import apply_rollup_changes, rollup_snapshot
+from .services import _record_changes
+
+# Estimated minutes per service type; unknown types use DEFAULT_JOB_MINUTES.
+JOB_MINUTES = {
+    "Oil Change": 30,
+    "Brake Check": 30,
+    "Chain Adjustment": 20,
+    "AC Service": 90,
+    "General Maintenance": 120,
+    "Engine Repair": 240,
+}
+DEFAULT_JOB_MINUTES = 60
+OPEN_STATUSES = ("Pending", "In Progress")
+
+
+def plan_assignments(jobs, workloads):
+    """Greedy longest-job-first balancing.
+
+    jobs is {service_id: minutes}, workloads {mechanic_id: minutes already booked}.
+    Each job, longest first, goes to the currently least-loaded mechanic (a min-heap),
+    which keeps the busiest mechanic within 4/3 of the optimum. O(n log n + n log m).
+    Returns ({service_id: mechanic_id}, {mechanic_id: minutes after assignment}).
+    """
+    heap = [(minutes, mechanic_id) for mechanic_id, minutes in workloads.items()]
+    heapq.heapify(heap)
+    plan = {}
+    if not heap:
+        return plan, dict(workloads)
+    for service_id, minutes in sorted(jobs.items(), key=lambda job: (-job[1], job[0])):
+        load, mechanic_id = heapq.heappop(heap)
+        plan[service_id] = mechanic_id
+        heapq.heappush(heap, (load + minutes, mechanic_id))
+    return plan, {mechanic_id: load for load, mechanic_id in heap}
+
+
+def _job_minutes(rows):
+    """Sum JOB_MINUTES per service_id from (service_id, service_name) rows."""
+    minutes = {}
+    for row in rows:
+        name = row["service_name"]
+        estimate = JOB_MINUTES.get(name, DEFAULT_JOB_MINUTES) if name else DEFAULT_JOB_MINUTES
+        minutes[row["service_id"]] = minutes.get(row["service_id"], 0) + estimate
+    return minutes
+
+
+class AssignmentService:
+
+    @db_exception_handler
+    def day_workload(self, service_date, mechanic_ids):
+        """Open minutes already assigned to each mechanic and unassigned pending jobs for a day.
+
+        Returns (workloads {mechanic_id: minutes}, jobs {service_id: minutes}).
+        """
+        with db_manager.get_connection() as conn, conn.cursor() as cur:
+            cur.execute(f"""
+                SELECT s.service_id, s.assigned_mechanic, t.service_name
+                FROM services s
+                LEFT JOIN service_types t ON t.service_id = s.service_id
+                WHERE s.service_date = %s AND s.status IN ({', '.join(['%s'] * len(OPEN_STATUSES))})
+            """, [service_date, *OPEN_STATUSES])
+            rows = cur.fetchall()
+        mechanic_of = {row["service_id"]: row["assigned_mechanic"] for row in rows}
+        workloads = {mechanic_id: 0 for mechanic_id in mechanic_ids}
+        jobs = {}
+        for service_id, minutes in _job_minutes(rows).items():
+            mechanic_id = mechanic_of[service_id]
+            if mechanic_id is None:
+                jobs[service_id] = minutes
+            elif mechanic_id in workloads:
+                workloads[mechanic_id] += minutes
+        return workloads, jobs
+
+    @db_exception_handler
+    def apply_plan(self, plan):
+        """Assign {service_id: mechanic_id} in one transaction, one UPDATE per mechanic.
+
+        Services assigned by someone else in the meantime are left alone and kept out
+        of the change feed and rollups. Returns the service ids actually assigned.
+        """
+        if not plan:
+            return []
+        with db_manager.transaction() as conn, conn.cursor() as cur:
+            # The snapshot locks the planned rows, so the unassigned set can't change under us.
+            before = rollup_snapshot(cur, list(plan))
+            cur.execute(f"""
+                SELECT service_id FROM services
+                WHERE service_id IN ({', '.join(['%s'] * len(plan))}) AND assigned_mechanic IS NULL
+            """, list(plan))
+            unassigned = {row["service_id"] for row in cur.fetchall()}
+            assigned = [service_id for service_id in plan if service_id in unassigned]
+            by_mechanic = {}
+            for service_id in assigned:
+                by_mechanic.setdefault(plan[service_id], []).append(service_id)
+            for mechanic_id, service_ids in by_mechanic.items():
+                cur.execute(f"""
+                    UPDATE services
+                    SET assigned_mechanic = %s, updated_at = CURRENT_TIMESTAMP, version = version + 1
+                    WHERE service_id IN ({', '.join(['%s'] * len(service_ids))})
+                      AND assigned_mechanic IS NULL
+                """, [mechanic_id, *service_ids])
+            if assigned:
+                _record_changes(cur, assigned)
+                apply_rollup_changes(cur, before, assigned)
+        query_cache.invalidate("services")
+        return assigned
@@ -0,0 +1,117 @@
+# cache.py
+import copy
+import threading
+from functools import wraps
+from cachetools import TTLCache
+from cachetools.keys import hashkey
+
+# Seconds a cached read may be served before it is re-queried, per table tag.
+TABLE_TTLS = {
+    "mechanics": 600,
+    "users": 300,
+    "vehicles": 120,
+    "services": 30,
+}
+DEFAULT_TTL = 60
+MAX_ENTRIES_PER_TABLE = 2048
+
+
+class QueryCache:
+    """Process-wide cache of query results shared by every Streamlit session.
+
+    Entries are tagged with the tables they read; write methods call
+    invalidate(table) so later reads see their changes. Each table has its own
+    TTL and LRU-bounded store. An entry lives in its first tag's store and
+    carries the generation of every tag it read, so a write to any of them
+    turns it into a miss without a separate index of dependents.
+    """
+
+    def __init__(self, ttls=None, default_ttl=DEFAULT_TTL, maxsize=MAX_ENTRIES_PER_TABLE):
+        self._ttls = dict(TABLE_TTLS if ttls is None else ttls)
+        self._default_ttl = default_ttl
+        self._maxsize = maxsize
+        self._caches = {}
+        self._generations = {}
+        self._lock = threading.RLock()
+        self.hits = {}
+        self.misses = {}
+
+    def _store(self, tag):
+        store = self._caches.get(tag)
+        if store is None:
+            store = self._caches[tag] = TTLCache(self._maxsize, self._ttls.get(tag, self._default_ttl))
+        return store
+
+    def _generation_of(self, tags):
+        return tuple(self._generations.get(t, 0) for t in tags)
+
+    def cached(self, *tags):
+        """Cache a read method's result under the given table tags.
+
+        The key is the method plus its arguments (excluding self). Calls with
+        unhashable arguments and None results (failed queries) are not cached.
+        """
+        primary = tags[0]
+
+        def decorator(func):
+            @wraps(func)
+            def wrapper(*args, **kwargs):
+                try:
+                    key = hashkey(func.__qualname__, *args[1:], **kwargs)
+                except TypeError:
+                    return func(*args, **kwargs)
+
+                with self._lock:
+                    store = self._store(primary)
+                    generations = self._generation_of(tags)
+                    entry = store.get(key)
+                    if entry is not None:
+                        if entry[0] == generations:
+                            self.hits[primary] = self.hits.get(primary, 0) + 1
+                            return copy.deepcopy(entry[1])
+                        # One of the other tables was written since; drop the stale entry.
+                        del store[key]
+                    self.misses[primary] = self.misses.get(primary, 0) + 1
+
+                value = func(*args, **kwargs)
+                if value is None:
+                    return None
+                with self._lock:
+                    # Skip the store if a write invalidated one of our tables mid-query.
+                    if generations == self._generation_of(tags):
+                        self._store(primary)[key] = (generations, copy.deepcopy(value))
+                return value
+            return wrapper
+        return decorator
+
+    def invalidate(self, *tables):
+        """Drop every cached result that read from any of the given tables."""
+        with self._lock:
+            for table in tables:
+                self._generations[table] = self._generations.get(table, 0) + 1
+                store = self._caches.get(table)
+                if store is not None:
+                    store.clear()
+
+    def clear(self):
+        """Drop everything, including results of queries still in flight."""
+        with self._lock:
+            for tag in set(self._caches) | set(self._generations):
+                self._generations[tag] = self._generations.get(tag, 0) + 1
+            for store in self._caches.values():
+                store.clear()
+
+    def stats(self):
+        with self._lock:
+            tags = set(self._caches) | set(self.hits) | set(self.misses)
+            return {
+                tag: {
+                    "entries": len(self._caches.get(tag, ())),
+                    "hits": self.hits.get(tag, 0),
+                    "misses": self.misses.get(tag, 0),
+                }
+                for tag in sorted(tags)
+            }
+
+
+query_cache = QueryCache()
@@ -1,31 +1,192 @@
 # connection.py
+import threading
+import time
+from contextlib import contextmanager
+from functools import partial
 import pymysql
 import streamlit as st
 
+
+class PoolExhaustedError(Exception):
+    """Raised when no connection is returned to the pool before the checkout timeout."""
+
+
+class ConnectionPool:
+    """Bounded, thread-safe pool of reusable database connections."""
+
+    def __init__(self, connect, min_size=1, max_size=10, idle_timeout=300, checkout_timeout=10):
+        self._connect = connect
+        self.min_size = min_size
+        self.max_size = max(max_size, min_size, 1)
+        self.idle_timeout = idle_timeout
+        self.checkout_timeout = checkout_timeout
+        self._idle = []  # (conn, returned_at), most recently returned last
+        self._size = 0
+        self._cond = threading.Condition()
+        for _ in range(min_size):
+            self._idle.append((self._connect(), time.monotonic()))
+            self._size += 1
+
+    def acquire(self):
+        """Check out a live connection, opening a new one if the pool has room."""
+        deadline = time.monotonic() + self.checkout_timeout
+        stale = []
+        with self._cond:
+            while True:
+                stale.extend(self._evict_idle())
+                if self._idle:
+                    conn, _ = self._idle.pop()
+                    break
+                if self._size < self.max_size:
+                    self._size += 1
+                    conn = None
+                    break
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    raise PoolExhaustedError(
+                        f"No database connection available after {self.checkout_timeout}s "
+                        f"({self.max_size} in use)"
+                    )
+                self._cond.wait(remaining)
+        self._close_all(stale)
+
+        if conn is not None:
+            try:
+                conn.ping(reconnect=False)
+                return conn
+            except Exception:
+                # Dead connection (server restart, wait_timeout): reuse its slot.
+                self._close_all([conn])
+        try:
+            return self._connect()
+        except Exception:
+            with self._cond:
+                self._size -= 1
+                self._cond.notify()
+            raise
+
+    def release(self, conn, discard=False):
+        """Return a connection to the pool, or close it if it is no longer usable."""
+        if discard or not getattr(conn, "open", True):
+            self._close_all([conn])
+            with self._cond:
+                self._size -= 1
+                self._cond.notify()
+            return
+        with self._cond:
+            self._idle.append((conn, time.monotonic()))
+            self._cond.notify()
+
+    def stats(self):
+        with self._cond:
+            return {
+                "size": self._size,
+                "idle": len(self._idle),
+                "in_use": self._size - len(self._idle),
+                "max_size": self.max_size,
+            }
+
+    def close(self):
+        """Close every idle connection; checked-out ones are closed on release."""
+        with self._cond:
+            idle = [conn for conn, _ in self._idle]
+            self._size -= len(idle)
+            self._idle = []
+        self._close_all(idle)
+
+    def _evict_idle(self):
+        """Drop connections idle past idle_timeout, keeping min_size. Caller holds the lock."""
+        cutoff = time.monotonic() - self.idle_timeout
+        stale = []
+        while self._idle and self._size > self.min_size and self._idle[0][1] < cutoff:
+            stale.append(self._idle.pop(0)[0])
+            self._size -= 1
+        return stale
+
+    @staticmethod
+    def _close_all(conns):
+        for conn in conns:
+            try:
+                conn.close()
+            except Exception:
+                pass
+
+
 class DatabaseManager:
-    """Handles MySQL connections using Streamlit secrets."""
+    """Handles pooled MySQL connections using Streamlit secrets."""
     _instance = None
+    _pool = None
+    _pool_lock = threading.Lock()
 
     def __new__(cls):
         if cls._instance is None:
             cls._instance = super(DatabaseManager, cls).__new__(cls)
         return cls._instance
 
+    def _get_pool(self):
+        if self._pool is None:
+            with self._pool_lock:
+                if self._pool is None:
+                    db = st.secrets["mysql"]
+                    connect = partial(
+                        pymysql.connect,
+                        host=db["host"],
+                        user=db["user"],
+                        password=db["password"],
+                        database=db["database"],
+                        port=int(db.get("port", 3306)),
+                        cursorclass=pymysql.cursors.DictCursor,
+                        autocommit=True
+                    )
+                    DatabaseManager._pool = ConnectionPool(
+                        connect,
+                        min_size=int(db.get("pool_min_size", 1)),
+                        max_size=int(db.get("pool_max_size", 10)),
+                        idle_timeout=float(db.get("pool_idle_timeout", 300)),
+                        checkout_timeout=float(db.get("pool_timeout", 10)),
+                    )
+        return self._pool
+
+    def use_pool(self, pool):
+        """Replace the connection pool, e.g. to point tooling at a local stand-in database."""
+        with self._pool_lock:
+            old, DatabaseManager._pool = self._pool, pool
+        if old is not None and old is not pool:
+            old.close()
+
+    @contextmanager
     def get_connection(self):
+        """Check out a pooled connection for the duration of a ``with`` block."""
         try:
-            db = st.secrets["mysql"]
-            return pymysql.connect(
-                host=db["host"],
-                user=db["user"],
-                password=db["password"],
-                database=db["database"],
-                port=int(db.get("port", 3306)),
-                cursorclass=pymysql.cursors.DictCursor,
-                autocommit=True
-            )
+            pool = self._get_pool()
+            conn = pool.acquire()
         except Exception as e:
             st.error(f"❌ Database connection failed: {e}")
             print(f"[DB ERROR] {e}")
             raise
 
+        broken = False
+        try:
+            yield conn
+        except BaseException:
+            # Never hand a connection with a half-finished transaction to the next caller.
+            try:
+                conn.rollback()
+            except Exception:
+                broken = True
+            raise
+        finally:
+            pool.release(conn, discard=broken)
+
+    @contextmanager
+    def transaction(self):
+        """Check out a connection and run the ``with`` block as a single transaction."""
+        with self.get_connection() as conn:
+            conn.begin()
+            yield conn
+            conn.commit()
+
+    def pool_stats(self):
+        return self._pool.stats() if self._pool is not None else None
+
 db_manager = DatabaseManager()
@@ -1,16 +1,200 @@
 # exception_handler.py
 import streamlit as st
+import bisect
+import os
+import threading
+import time
 import traceback
 import sys
+from collections import deque
+from functools import wraps
+
+# Upper bounds (seconds) of the latency histogram buckets, Prometheus-style.
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+# Recent latencies kept per method for p50/p95/p99.
+SAMPLE_WINDOW = 2048
+# When set, the Prometheus dump is rewritten to this file at most every DUMP_INTERVAL seconds.
+METRICS_FILE = os.environ.get("MOTORMATES_METRICS_FILE")
+DUMP_INTERVAL = 15
+
+
+class MethodStats:
+    """Call count, errors, rows and latency distribution for one DB method."""
+
+    def __init__(self):
+        self.calls = 0
+        self.errors = 0
+        self.rows = 0
+        self.total_seconds = 0.0
+        self.bucket_counts = [0] * (len(LATENCY_BUCKETS) + 1)
+        self.samples = deque(maxlen=SAMPLE_WINDOW)
+
+    def observe(self, seconds, rows, error):
+        self.calls += 1
+        self.errors += int(error)
+        self.rows += rows
+        self.total_seconds += seconds
+        self.bucket_counts[bisect.bisect_left(LATENCY_BUCKETS, seconds)] += 1
+        self.samples.append(seconds)
+
+    def percentile(self, q):
+        if not self.samples:
+            return 0.0
+        ordered = sorted(self.samples)
+        return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+
+class MetricsRegistry:
+    """In-process registry of per-method DB metrics."""
+
+    def __init__(self):
+        self._stats = {}
+        self._lock = threading.Lock()
+        self._last_dump = 0.0
+
+    def observe(self, method, seconds, rows=0, error=False):
+        with self._lock:
+            stats = self._stats.get(method)
+            if stats is None:
+                stats = self._stats[method] = MethodStats()
+            stats.observe(seconds, rows, error)
+
+    def snapshot(self):
+        """One dict per method, slowest total time first."""
+        with self._lock:
+            rows = [
+                {
+                    "method": method,
+                    "calls": s.calls,
+                    "errors": s.errors,
+                    "rows": s.rows,
+                    "total_ms": round(s.total_seconds * 1000, 2),
+                    "p50_ms": round(s.percentile(0.50) * 1000, 2),
+                    "p95_ms": round(s.percentile(0.95) * 1000, 2),
+                    "p99_ms": round(s.percentile(0.99) * 1000, 2),
+                }
+                for method, s in self._stats.items()
+            ]
+        return sorted(rows, key=lambda r: r["total_ms"], reverse=True)
+
+    def render_prometheus(self):
+        """Prometheus text exposition of DB, query cache and pool metrics."""
+        lines = []
+
+        def family(name, kind, help_text):
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} {kind}")
+
+        with self._lock:
+            stats = dict(self._stats)
+            family("motormates_db_calls_total", "counter", "Database method calls.")
+            for m, s in stats.items():
+                lines.append(f'motormates_db_calls_total{{method="{m}"}} {s.calls}')
+            family("motormates_db_errors_total", "counter", "Database method calls that raised.")
+            for m, s in stats.items():
+                lines.append(f'motormates_db_errors_total{{method="{m}"}} {s.errors}')
+            family("motormates_db_rows_total", "counter", "Rows returned by database methods.")
+            for m, s in stats.items():
+                lines.append(f'motormates_db_rows_total{{method="{m}"}} {s.rows}')
+            family("motormates_db_latency_seconds", "histogram", "Database method latency.")
+            for m, s in stats.items():
+                cumulative = 0
+                for bound, count in zip(LATENCY_BUCKETS + ("+Inf",), s.bucket_counts):
+                    cumulative += count
+                    lines.append(f'motormates_db_latency_seconds_bucket{{method="{m}",le="{bound}"}} {cumulative}')
+                lines.append(f'motormates_db_latency_seconds_sum{{method="{m}"}} {s.total_seconds:.6f}')
+                lines.append(f'motormates_db_latency_seconds_count{{method="{m}"}} {s.calls}')
+            family("motormates_db_latency_quantile_seconds", "gauge", "Recent latency quantiles.")
+            for m, s in stats.items():
+                for q in (0.5, 0.95, 0.99):
+                    lines.append(
+                        f'motormates_db_latency_quantile_seconds{{method="{m}",quantile="{q}"}} {s.percentile(q):.6f}'
+                    )
+
+        from .cache import query_cache
+        from .connection import db_manager
+        cache_stats = query_cache.stats()
+        family("motormates_query_cache_hits_total", "counter", "Query cache hits per table.")
+        for table, c in cache_stats.items():
+            lines.append(f'motormates_query_cache_hits_total{{table="{table}"}} {c["hits"]}')
+        family("motormates_query_cache_misses_total", "counter", "Query cache misses per table.")
+        for table, c in cache_stats.items():
+            lines.append(f'motormates_query_cache_misses_total{{table="{table}"}} {c["misses"]}')
+        pool = db_manager.pool_stats()
+        if pool:
+            family("motormates_db_pool_connections", "gauge", "Pooled database connections.")
+            lines.append(f'motormates_db_pool_connections{{state="idle"}} {pool["idle"]}')
+            lines.append(f'motormates_db_pool_connections{{state="in_use"}} {pool["in_use"]}')
+        return "\n".join(lines) + "\n"
+
+    def dump(self, path):
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, "w") as f:
+            f.write(self.render_prometheus())
+        os.replace(tmp_path, path)
+
+    def maybe_dump(self):
+        """Rewrite METRICS_FILE if it is configured and the last dump is stale."""
+        if not METRICS_FILE:
+            return
+        now = time.monotonic()
+        with self._lock:
+            if now - self._last_dump < DUMP_INTERVAL:
+                return
+            self._last_dump = now
+        try:
+            self.dump(METRICS_FILE)
+        except OSError as e:
+            print(f"[METRICS] Could not write {METRICS_FILE}: {e}")
+
+    def reset(self):
+        with self._lock:
+            self._stats.clear()
+
+
+metrics = MetricsRegistry()
+
+# Running DB time per thread, so callers can attribute DB cost to a block of work.
+_thread_totals = threading.local()
+
+
+def thread_db_totals():
+    """(seconds, calls) spent in DB methods on the current thread so far."""
+    return getattr(_thread_totals, "seconds", 0.0), getattr(_thread_totals, "calls", 0)
+
+
+def _add_thread_total(seconds):
+    _thread_totals.seconds = getattr(_thread_totals, "seconds", 0.0) + seconds
+    _thread_totals.calls = getattr(_thread_totals, "calls", 0) + 1
+
+
+def _count_rows(result):
+    if isinstance(result, tuple) and result and isinstance(result[0], list):
+        result = result[0]  # (rows, next_cursor) pages
+    if isinstance(result, (list, tuple)):
+        return len(result)
+    if isinstance(result, dict):
+        return 1
+    return 0
+
 
 def db_exception_handler(func):
-    """Decorator to handle database exceptions and log them."""
+    """Decorator to handle database exceptions, log them and record call metrics."""
+    @wraps(func)
     def wrapper(*args, **kwargs):
+        start = time.perf_counter()
         try:
-            return func(*args, **kwargs)
+            result = func(*args, **kwargs)
+            elapsed = time.perf_counter() - start
+            metrics.observe(func.__qualname__, elapsed, _count_rows(result))
+            _add_thread_total(elapsed)
+            return result
         except Exception as e:
+            elapsed = time.perf_counter() - start
+            metrics.observe(func.__qualname__, elapsed, error=True)
+            _add_thread_total(elapsed)
             st.error(f"❌ Error in {func.__name__}: {e}")
-            
+
             print("\n" + "="*40)
             print(f"[ERROR] Function: {func.__name__}")
             print("Exception Type:", type(e).__name__)
@@ -19,4 +203,6 @@ def db_exception_handler(func):
             traceback.print_exc(file=sys.stdout)
             print("="*40 + "\n")
             return None
+        finally:
+            metrics.maybe_dump()
     return wrapper
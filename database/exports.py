@@ -0,0 +1,141 @@
+# exports.py
+# Streams services to CSV or Parquet without loading the result set into memory.
+#
+#   python -m database.exports --from 2025-07-01 --to 2025-07-31 --out july.parquet
+import argparse
+import csv
+import io
+import json
+from datetime import date
+import pymysql
+import pyarrow as pa
+import pyarrow.parquet as pq
+from .connection import db_manager
+from .exception_handler import db_exception_handler
+from .services import _build_service_filters
+
+# Rows pulled from the server-side cursor (and written) per chunk.
+EXPORT_CHUNK_SIZE = 5000
+EXPORT_FORMATS = ("csv", "parquet")
+
+EXPORT_SELECT = """
+    SELECT s.service_id, s.request_date, s.service_date,
+           u.full_name AS customer_name, u.email AS customer_email,
+           v.vehicle_no, v.vehicle_type, v.vehicle_brand, v.vehicle_model,
+           s.service_types, s.status, m.mechanic_name AS mechanic,
+           s.payment_status, s.base_cost, s.extra_charges, s.Paid AS paid,
+           s.charge_description, s.work_done
+    FROM services s
+    JOIN users u ON s.customer_id = u.id
+    JOIN vehicles v ON s.vehicle_id = v.vehicle_id
+    LEFT JOIN mechanics m ON s.assigned_mechanic = m.mechanic_id
+"""
+
+EXPORT_SCHEMA = pa.schema([
+    ("service_id", pa.int64()),
+    ("request_date", pa.timestamp("s")),
+    ("service_date", pa.date32()),
+    ("customer_name", pa.string()),
+    ("customer_email", pa.string()),
+    ("vehicle_no", pa.string()),
+    ("vehicle_type", pa.string()),
+    ("vehicle_brand", pa.string()),
+    ("vehicle_model", pa.string()),
+    ("service_types", pa.string()),
+    ("status", pa.string()),
+    ("mechanic", pa.string()),
+    ("payment_status", pa.string()),
+    ("base_cost", pa.int64()),
+    ("extra_charges", pa.int64()),
+    ("total", pa.int64()),
+    ("paid", pa.int64()),
+    ("charge_description", pa.string()),
+    ("work_done", pa.string()),
+])
+
+
+def _prepare(row):
+    """Flatten the JSON service_types list and add the billed total."""
+    types = row.get("service_types")
+    if isinstance(types, str):
+        try:
+            types = json.loads(types)
+        except ValueError:
+            types = [types]
+    row["service_types"] = ", ".join(types or [])
+    row["base_cost"] = row.get("base_cost") or 0
+    row["extra_charges"] = row.get("extra_charges") or 0
+    row["total"] = row["base_cost"] + row["extra_charges"]
+    row["paid"] = row.get("paid") or 0
+    return row
+
+
+class _CsvSink:
+    def __init__(self, out):
+        self._text = io.TextIOWrapper(out, encoding="utf-8", newline="", write_through=True)
+        self._writer = csv.DictWriter(self._text, fieldnames=EXPORT_SCHEMA.names)
+        self._writer.writeheader()
+
+    def write(self, rows):
+        self._writer.writerows(rows)
+
+    def close(self):
+        self._text.flush()
+        self._text.detach()
+
+
+class _ParquetSink:
+    def __init__(self, out):
+        self._writer = pq.ParquetWriter(out, EXPORT_SCHEMA, compression="zstd")
+
+    def write(self, rows):
+        self._writer.write_table(pa.Table.from_pylist(rows, schema=EXPORT_SCHEMA))
+
+    def close(self):
+        self._writer.close()
+
+
+class ExportService:
+
+    @db_exception_handler
+    def export_services(self, out, fmt="csv", filters=None, chunk_size=EXPORT_CHUNK_SIZE):
+        """Write services matching filters to the binary file object out, oldest first.
+
+        Accepts the same filters as ServiceManager.query_services. Rows come off an
+        unbuffered server-side cursor chunk_size at a time, so memory stays bounded by
+        one chunk plus the writer's buffers. Returns the number of rows written.
+        """
+        if fmt not in EXPORT_FORMATS:
+            raise ValueError(f"Unknown export format: {fmt}")
+        clauses, params = _build_service_filters(filters)
+        where = f" WHERE {' AND '.join(clauses)}" if clauses else ""
+        sink = _CsvSink(out) if fmt == "csv" else _ParquetSink(out)
+        written = 0
+        try:
+            with db_manager.get_connection() as conn, conn.cursor(pymysql.cursors.SSDictCursor) as cur:
+                cur.execute(EXPORT_SELECT + where + " ORDER BY s.request_date, s.service_id", params)
+                while True:
+                    rows = cur.fetchmany(chunk_size)
+                    if not rows:
+                        break
+                    sink.write([_prepare(row) for row in rows])
+                    written += len(rows)
+        finally:
+            sink.close()
+        return written
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Export services to CSV or Parquet.")
+    parser.add_argument("--from", dest="start", type=date.fromisoformat, help="first request day (YYYY-MM-DD)")
+    parser.add_argument("--to", dest="end", type=date.fromisoformat, help="last request day (YYYY-MM-DD)")
+    parser.add_argument("--format", choices=EXPORT_FORMATS, help="defaults to the --out file extension")
+    parser.add_argument("--chunk-size", type=int, default=EXPORT_CHUNK_SIZE)
+    parser.add_argument("--out", required=True)
+    args = parser.parse_args()
+    fmt = args.format or ("parquet" if args.out.endswith(".parquet") else "csv")
+    with open(args.out, "wb") as f:
+        count = ExportService().export_services(
+            f, fmt, {"start_date": args.start, "end_date": args.end}, args.chunk_size
+        )
+    print(f"[EXPORT] Wrote {count} services to {args.out}")
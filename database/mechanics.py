@@ -1,10 +1,12 @@
 # mechanics.py
 import streamlit as st
+from .cache import query_cache
 from .connection import db_manager
 from .exception_handler import db_exception_handler
 
 class MechanicService:
 
+    @query_cache.cached("mechanics")
     @db_exception_handler
     def fetch_all_mechanics(self):
         with db_manager.get_connection() as conn, conn.cursor() as cur:
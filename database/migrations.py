@@ -0,0 +1,151 @@
+# migrations.py
+from datetime import date, datetime
+from .rollups import rebuild_rollups
+from .services import ADMIN_SERVICE_SELECT, _build_service_filters
+
+
+def _index_exists(cur, table, name):
+    cur.execute("""
+        SELECT 1 FROM information_schema.statistics
+        WHERE table_schema = DATABASE() AND table_name = %s AND index_name = %s
+        LIMIT 1
+    """, (table, name))
+    return cur.fetchone() is not None
+
+
+def _column_exists(cur, table, name):
+    cur.execute("""
+        SELECT 1 FROM information_schema.columns
+        WHERE table_schema = DATABASE() AND table_name = %s AND column_name = %s
+        LIMIT 1
+    """, (table, name))
+    return cur.fetchone() is not None
+
+
+def add_column(table, name, definition):
+    """Migration step adding a column unless a previous run already did."""
+    def step(cur):
+        if not _column_exists(cur, table, name):
+            cur.execute(f"ALTER TABLE {table} ADD COLUMN {name} {definition}")
+    step.__doc__ = f"ALTER TABLE {table} ADD COLUMN {name} {definition}"
+    return step
+
+
+def execute(sql):
+    """Migration step running one idempotent statement."""
+    def step(cur):
+        cur.execute(sql)
+    step.__doc__ = sql.strip()
+    return step
+
+
+def add_index(table, name, columns):
+    """Migration step creating an index unless a previous run already did."""
+    def step(cur):
+        if not _index_exists(cur, table, name):
+            cur.execute(f"CREATE INDEX {name} ON {table} ({columns})")
+    step.__doc__ = f"CREATE INDEX {name} ON {table} ({columns})"
+    return step
+
+
+# (version, description, steps) in the order they must be applied.
+# Steps take a cursor; MySQL DDL commits implicitly, so each step must be safe to re-run.
+MIGRATIONS = [
+    (1, "Indexes for hot service, vehicle and user queries", [
+        add_index("users", "idx_users_phone", "phone"),
+        add_index("users", "idx_users_full_name", "full_name"),
+        # Admin list keyset order and date-range statistics.
+        add_index("services", "idx_services_request_date", "request_date"),
+        add_index("services", "idx_services_status_request_date", "status, request_date"),
+        add_index("services", "idx_services_payment_status_request_date", "payment_status, request_date"),
+        # Customer history, newest first.
+        add_index("services", "idx_services_customer_request_date", "customer_id, request_date"),
+        # My Vehicles / Book Service ordering.
+        add_index(
+            "vehicles", "idx_vehicles_user_sort",
+            "user_id, vehicle_type, vehicle_brand, vehicle_model, vehicle_no"
+        ),
+    ]),
+    (2, "Service versions and change feed", [
+        add_column("services", "updated_at", "DATETIME DEFAULT CURRENT_TIMESTAMP"),
+        add_column("services", "version", "INT NOT NULL DEFAULT 1"),
+        execute("""
+            CREATE TABLE IF NOT EXISTS service_changes (
+                change_id BIGINT PRIMARY KEY AUTO_INCREMENT,
+                service_id INT NOT NULL,
+                version INT NOT NULL,
+                changed_at DATETIME DEFAULT CURRENT_TIMESTAMP
+            )
+        """),
+    ]),
+    (3, "Daily service rollups", [
+        execute("""
+            CREATE TABLE IF NOT EXISTS daily_service_rollup (
+                day DATE NOT NULL,
+                status VARCHAR(20) NOT NULL,
+                vehicle_type VARCHAR(20) NOT NULL,
+                mechanic_id INT NOT NULL,
+                services INT NOT NULL,
+                billed BIGINT NOT NULL,
+                paid BIGINT NOT NULL,
+                PRIMARY KEY (day, status, vehicle_type, mechanic_id)
+            )
+        """),
+        execute("""
+            CREATE TABLE IF NOT EXISTS daily_service_type_rollup (
+                day DATE NOT NULL,
+                status VARCHAR(20) NOT NULL,
+                vehicle_type VARCHAR(20) NOT NULL,
+                mechanic_id INT NOT NULL,
+                service_name VARCHAR(100) NOT NULL,
+                services INT NOT NULL,
+                billed BIGINT NOT NULL,
+                paid BIGINT NOT NULL,
+                PRIMARY KEY (day, status, vehicle_type, mechanic_id, service_name)
+            )
+        """),
+        # Backfill; replaces existing rows, so it is safe to re-run.
+        rebuild_rollups,
+    ]),
+    (4, "Service date index for mechanic auto-assignment", [
+        add_index("services", "idx_services_service_date_status", "service_date, status"),
+    ]),
+]
+
+
+def _service_page_query(filters):
+    clauses, params = _build_service_filters(filters)
+    where = f" WHERE {' AND '.join(clauses)}" if clauses else ""
+    return (
+        ADMIN_SERVICE_SELECT + where + " ORDER BY s.request_date DESC, s.service_id DESC LIMIT 51",
+        params,
+    )
+
+
+def hot_queries():
+    """Representative (name, sql, params) for the query paths the indexes above serve."""
+    today = date.today()
+    month_start = today.replace(day=1)
+    return [
+        ("admin list: date range",
+         *_service_page_query({"start_date": month_start, "end_date": today})),
+        ("admin list: status + date range",
+         *_service_page_query({"start_date": month_start, "end_date": today, "statuses": ["Pending"]})),
+        ("admin list: vehicle number prefix",
+         *_service_page_query({"vehicle_no_prefix": "MP09"})),
+        ("statistics: date range",
+         "SELECT status, SUM(services) FROM daily_service_rollup WHERE day >= %s GROUP BY status",
+         [month_start]),
+        ("auto-assign: open services for a day",
+         "SELECT service_id FROM services WHERE service_date = %s AND status IN (%s, %s)",
+         [today, "Pending", "In Progress"]),
+        ("payment status filter",
+         "SELECT service_id FROM services WHERE payment_status = %s ORDER BY request_date DESC LIMIT 50",
+         ["Pending"]),
+        ("customer history",
+         "SELECT service_id FROM services WHERE customer_id = %s ORDER BY request_date DESC", [1]),
+        ("vehicles by user",
+         """SELECT * FROM vehicles WHERE user_id = %s
+            ORDER BY vehicle_type, vehicle_brand, vehicle_model, vehicle_no""", [1]),
+        ("user by phone", "SELECT id FROM users WHERE phone = %s", ["0000000000"]),
+    ]
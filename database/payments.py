@@ -1,15 +1,36 @@
 # payments.py
+from .cache import query_cache
 from .connection import db_manager
 from .exception_handler import db_exception_handler
+from .rollups import apply_rollup_changes, rollup_snapshot
+from .services import _record_changes
 
 class PaymentService:
     
     @db_exception_handler
-    def update_payment_status(self, service_id, paid_amt):
-        with db_manager.get_connection() as conn, conn.cursor() as cur:
-            cur.execute("""
-                UPDATE services
-                SET payment_status = %s, Paid = %s
-                WHERE service_id = %s
-            """, ("Done", paid_amt, service_id))
-            return cur.rowcount > 0
+    def update_payment_status(self, service_id, paid_amt, expected_version=None):
+        """Record a payment of paid_amt and mark the service paid.
+
+        With expected_version the payment only applies if nobody changed the service
+        (e.g. added extra charges) since the payer saw it. Returns False when no row
+        was updated.
+        """
+        sql = """
+            UPDATE services
+            SET payment_status = %s, Paid = COALESCE(Paid, 0) + %s,
+                updated_at = CURRENT_TIMESTAMP, version = version + 1
+            WHERE service_id = %s
+        """
+        params = ["Done", paid_amt, service_id]
+        if expected_version is not None:
+            sql += " AND version = %s"
+            params.append(expected_version)
+        with db_manager.transaction() as conn, conn.cursor() as cur:
+            before = rollup_snapshot(cur, [service_id])
+            cur.execute(sql, params)
+            updated = cur.rowcount > 0
+            if updated:
+                _record_changes(cur, [service_id])
+                apply_rollup_changes(cur, before, [service_id])
+        query_cache.invalidate("services")
+        return updated
@@ -0,0 +1,220 @@
+# rollups.py
+# Daily aggregates of services, kept current by every service write path as per-row deltas.
+#
+#   python -m database.rollups                 # rebuild everything
+#   python -m database.rollups --from 2025-01-01 --to 2025-01-31
+import argparse
+from datetime import date, datetime, time, timedelta
+from .cache import query_cache
+from .connection import db_manager
+from .exception_handler import db_exception_handler
+
+# One row per (day, status, vehicle_type, mechanic); mechanic_id 0 means unassigned.
+# billed is base_cost + extra_charges, paid is the Paid column.
+SERVICE_ROLLUP_SELECT = """
+    SELECT DATE(s.request_date) AS day, COALESCE(s.status, '') AS status,
+           COALESCE(v.vehicle_type, '') AS vehicle_type,
+           COALESCE(s.assigned_mechanic, 0) AS mechanic_id,
+           COUNT(*) AS services,
+           SUM(COALESCE(s.base_cost, 0) + COALESCE(s.extra_charges, 0)) AS billed,
+           SUM(COALESCE(s.Paid, 0)) AS paid
+    FROM services s
+    JOIN vehicles v ON s.vehicle_id = v.vehicle_id
+"""
+SERVICE_ROLLUP_GROUP = " GROUP BY DATE(s.request_date), COALESCE(s.status, ''), COALESCE(v.vehicle_type, ''), COALESCE(s.assigned_mechanic, 0)"
+
+# Same keys plus service_name, one count per service_types line item. billed is the
+# line item price; paid counts it only once the service's payment_status is Done.
+SERVICE_TYPE_ROLLUP_SELECT = """
+    SELECT DATE(s.request_date) AS day, COALESCE(s.status, '') AS status,
+           COALESCE(v.vehicle_type, '') AS vehicle_type,
+           COALESCE(s.assigned_mechanic, 0) AS mechanic_id,
+           t.service_name,
+           COUNT(*) AS services,
+           SUM(COALESCE(t.price, 0)) AS billed,
+           SUM(CASE WHEN s.payment_status = 'Done' THEN COALESCE(t.price, 0) ELSE 0 END) AS paid
+    FROM service_types t
+    JOIN services s ON t.service_id = s.service_id
+    JOIN vehicles v ON s.vehicle_id = v.vehicle_id
+"""
+SERVICE_TYPE_ROLLUP_GROUP = SERVICE_ROLLUP_GROUP + ", t.service_name"
+
+ROLLUP_KEYS = {
+    "daily_service_rollup": ("day", "status", "vehicle_type", "mechanic_id"),
+    "daily_service_type_rollup": ("day", "status", "vehicle_type", "mechanic_id", "service_name"),
+}
+
+# (table, select, group by) for each rollup.
+ROLLUPS = [
+    ("daily_service_rollup", SERVICE_ROLLUP_SELECT, SERVICE_ROLLUP_GROUP),
+    ("daily_service_type_rollup", SERVICE_TYPE_ROLLUP_SELECT, SERVICE_TYPE_ROLLUP_GROUP),
+]
+
+# Breakdowns daily_trends can group by, and the rollup column each one reads.
+TREND_DIMENSIONS = {
+    "status": "status",
+    "vehicle_type": "vehicle_type",
+    "mechanic": "mechanic_id",
+    "service": "service_name",
+}
+
+
+def _recompute(cur, start_day, end_day):
+    """Replace the rollup rows for start_day..end_day (inclusive, None for open) from services."""
+    clauses, params = [], []
+    if start_day:
+        clauses.append("s.request_date >= %s")
+        params.append(datetime.combine(start_day, time.min))
+    if end_day:
+        clauses.append("s.request_date < %s")
+        params.append(datetime.combine(end_day + timedelta(days=1), time.min))
+    where = f" WHERE {' AND '.join(clauses)}" if clauses else ""
+    day_clauses = [c for c, v in (("day >= %s", start_day), ("day <= %s", end_day)) if v]
+    day_params = [v for v in (start_day, end_day) if v]
+    day_where = f" WHERE {' AND '.join(day_clauses)}" if day_clauses else ""
+    for table, select, group in ROLLUPS:
+        cur.execute(f"DELETE FROM {table}{day_where}", day_params)
+        cur.execute(
+            f"INSERT INTO {table} ({', '.join(ROLLUP_KEYS[table])}, services, billed, paid) "
+            + select + where + group,
+            params
+        )
+
+
+def _contributions(cur, service_ids, lock=False):
+    """{service_id: [(table, key, (services, billed, paid)), ...]} for the services as stored now.
+
+    With lock, the services rows are read FOR UPDATE so nobody changes them before
+    the caller's write; only those rows are locked, not the rest of their day.
+    """
+    if not service_ids:
+        return {}
+    marks = ", ".join(["%s"] * len(service_ids))
+    cur.execute(f"""
+        SELECT service_id, request_date, status, vehicle_id, assigned_mechanic,
+               base_cost, extra_charges, Paid, payment_status
+        FROM services WHERE service_id IN ({marks})
+    """ + (" FOR UPDATE" if lock else ""), service_ids)
+    services = [s for s in cur.fetchall() if s["request_date"]]
+    if not services:
+        return {}
+    vehicle_ids = list({s["vehicle_id"] for s in services})
+    cur.execute(
+        f"SELECT vehicle_id, vehicle_type FROM vehicles WHERE vehicle_id IN ({', '.join(['%s'] * len(vehicle_ids))})",
+        vehicle_ids
+    )
+    vehicle_types = {v["vehicle_id"]: v["vehicle_type"] for v in cur.fetchall()}
+    cur.execute(f"SELECT service_id, service_name, price FROM service_types WHERE service_id IN ({marks})",
+                service_ids)
+    line_items = {}
+    for item in cur.fetchall():
+        line_items.setdefault(item["service_id"], []).append(item)
+
+    result = {}
+    for s in services:
+        key = (s["request_date"].date(), s["status"] or "", vehicle_types.get(s["vehicle_id"]) or "",
+               s["assigned_mechanic"] or 0)
+        billed = (s["base_cost"] or 0) + (s["extra_charges"] or 0)
+        rows = [("daily_service_rollup", key, (1, billed, s["Paid"] or 0))]
+        done = s["payment_status"] == "Done"
+        for item in line_items.get(s["service_id"], []):
+            price = item["price"] or 0
+            rows.append(("daily_service_type_rollup", key + (item["service_name"],),
+                         (1, price, price if done else 0)))
+        result[s["service_id"]] = rows
+    return result
+
+
+def rollup_snapshot(cur, service_ids):
+    """Lock services about to be written and capture what they add to the rollups.
+
+    Pass the result to apply_rollup_changes after the write, in the same transaction.
+    New services need no snapshot; pass {}.
+    """
+    return _contributions(cur, list(dict.fromkeys(service_ids)), lock=True)
+
+
+def apply_rollup_changes(cur, before, service_ids):
+    """Add the difference between before and the services' current values to the rollups.
+
+    Each rollup row is bumped with INSERT ... ON DUPLICATE KEY UPDATE, in key order so
+    concurrent writers lock rollup rows in the same order.
+    """
+    service_ids = list(dict.fromkeys(service_ids))
+    after = _contributions(cur, service_ids)
+    deltas = {}
+    for contributions, sign in ((before, -1), (after, 1)):
+        for service_id in service_ids:
+            for table, key, measures in contributions.get(service_id, ()):
+                delta = deltas.setdefault((table, key), [0, 0, 0])
+                for i, value in enumerate(measures):
+                    delta[i] += sign * value
+    for table, keys in ROLLUP_KEYS.items():
+        changes = sorted(
+            (key, delta) for (t, key), delta in deltas.items() if t == table and any(delta)
+        )
+        if not changes:
+            continue
+        cur.executemany(f"""
+            INSERT INTO {table} ({', '.join(keys)}, services, billed, paid)
+            VALUES ({', '.join(['%s'] * (len(keys) + 3))}) AS new
+            ON DUPLICATE KEY UPDATE services = services + new.services,
+                billed = billed + new.billed, paid = paid + new.paid
+        """, [list(key) + delta for key, delta in changes])
+        emptied = [list(key) for key, delta in changes if delta[0] < 0]
+        if emptied:
+            cur.executemany(
+                f"DELETE FROM {table} WHERE {' AND '.join(f'{k} = %s' for k in keys)} AND services = 0",
+                emptied
+            )
+
+
+def rebuild_rollups(cur, start_day=None, end_day=None):
+    """Recompute every rollup row between start_day and end_day (all days by default).
+
+    Reads every service in the range; run it from the CLI or a migration, not a write path.
+    """
+    _recompute(cur, start_day, end_day)
+
+
+class RollupService:
+
+    @db_exception_handler
+    def rebuild(self, start_day=None, end_day=None):
+        with db_manager.transaction() as conn, conn.cursor() as cur:
+            rebuild_rollups(cur, start_day, end_day)
+        query_cache.invalidate("services")
+
+    @query_cache.cached("services")
+    @db_exception_handler
+    def daily_trends(self, start_day, end_day, dimension="status"):
+        """Per-day services, billed and paid between two dates, broken down by dimension.
+
+        dimension is a TREND_DIMENSIONS key; "service" reads the per-line-item rollup.
+        Returns rows of {day, bucket, services, billed, paid} ordered by day.
+        """
+        column = TREND_DIMENSIONS[dimension]
+        table = "daily_service_type_rollup" if dimension == "service" else "daily_service_rollup"
+        with db_manager.get_connection() as conn, conn.cursor() as cur:
+            cur.execute(f"""
+                SELECT day, {column} AS bucket, SUM(services) AS services,
+                       SUM(billed) AS billed, SUM(paid) AS paid
+                FROM {table}
+                WHERE day >= %s AND day <= %s
+                GROUP BY day, {column}
+                ORDER BY day
+            """, (start_day, end_day))
+            return [
+                dict(row, services=int(row["services"]), billed=int(row["billed"] or 0),
+                     paid=int(row["paid"] or 0))
+                for row in cur.fetchall()
+            ]
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Rebuild the daily service rollup tables.")
+    parser.add_argument("--from", dest="start", type=date.fromisoformat, help="first day (YYYY-MM-DD)")
+    parser.add_argument("--to", dest="end", type=date.fromisoformat, help="last day (YYYY-MM-DD)")
+    args = parser.parse_args()
+    RollupService().rebuild(args.start, args.end)
+    print(f"[ROLLUP] Rebuilt {args.start or 'start'} .. {args.end or 'end'}")
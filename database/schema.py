@@ -1,6 +1,7 @@
 # schema.py
 from .connection import db_manager
 from .exception_handler import db_exception_handler
+from .migrations import MIGRATIONS, hot_queries
 
 class SchemaManager:
     """Handles creation and initialization of database tables."""
@@ -74,3 +75,75 @@ class SchemaManager:
                     FOREIGN KEY (service_id) REFERENCES services(service_id) ON DELETE CASCADE
                 );
             """)
+
+            cur.execute("""
+                CREATE TABLE IF NOT EXISTS schema_version (
+                    version INT PRIMARY KEY,
+                    description VARCHAR(200) NOT NULL,
+                    applied_at DATETIME DEFAULT CURRENT_TIMESTAMP
+                );
+            """)
+
+    @db_exception_handler
+    def current_version(self):
+        with db_manager.get_connection() as conn, conn.cursor() as cur:
+            cur.execute("SELECT COALESCE(MAX(version), 0) AS version FROM schema_version")
+            return cur.fetchone()["version"]
+
+    @db_exception_handler
+    def migrate(self):
+        """Apply pending migrations in order; returns the versions applied."""
+        applied = []
+        with db_manager.get_connection() as conn, conn.cursor() as cur:
+            # Serialize concurrent runners (e.g. several app processes starting at once).
+            cur.execute("SELECT GET_LOCK('motormates_schema_migrate', 60) AS locked")
+            if not cur.fetchone()["locked"]:
+                raise RuntimeError("Another process is migrating the schema.")
+            try:
+                cur.execute("SELECT COALESCE(MAX(version), 0) AS version FROM schema_version")
+                current = cur.fetchone()["version"]
+                for version, description, steps in MIGRATIONS:
+                    if version <= current:
+                        continue
+                    for step in steps:
+                        step(cur)
+                    cur.execute(
+                        "INSERT INTO schema_version (version, description) VALUES (%s, %s)",
+                        (version, description)
+                    )
+                    applied.append(version)
+                    print(f"[MIGRATE] Applied {version}: {description}")
+            finally:
+                cur.execute("SELECT RELEASE_LOCK('motormates_schema_migrate')")
+        return applied
+
+    @db_exception_handler
+    def check_query_plans(self):
+        """EXPLAIN each hot query and report whether every table access uses an index.
+
+        On near-empty tables MySQL may prefer a full scan regardless of indexes,
+        so run this against realistically sized data.
+        """
+        report = []
+        with db_manager.get_connection() as conn, conn.cursor() as cur:
+            for name, sql, params in hot_queries():
+                cur.execute("EXPLAIN " + sql, params)
+                for row in cur.fetchall():
+                    report.append({
+                        "query": name,
+                        "table": row.get("table"),
+                        "type": row.get("type"),
+                        "key": row.get("key"),
+                        "uses_index": row.get("type") != "ALL" and row.get("key") is not None,
+                    })
+        return report
+
+
+if __name__ == "__main__":
+    schema = SchemaManager()
+    schema.create_tables()
+    schema.migrate()
+    print(f"Schema version: {schema.current_version()}")
+    for row in schema.check_query_plans() or []:
+        flag = "OK  " if row["uses_index"] else "SCAN"
+        print(f"{flag} {row['query']:<36} {row['table']:<10} type={row['type']} key={row['key']}")
@@ -1,61 +1,280 @@
 # services.py
 import json
+from collections import namedtuple
+from datetime import datetime, time, timedelta
+from .cache import query_cache
 from .connection import db_manager
 from .exception_handler import db_exception_handler
+from .rollups import apply_rollup_changes, rollup_snapshot
+
+ADMIN_SERVICE_SELECT = """
+    SELECT s.*, u.full_name AS customer_name, u.email AS customer_email, u.phone AS customer_phone,
+           v.vehicle_type, v.vehicle_brand, v.vehicle_model, v.vehicle_no
+    FROM services s
+    JOIN users u ON s.customer_id = u.id
+    JOIN vehicles v ON s.vehicle_id = v.vehicle_id
+"""
+
+
+# changes_since reads at most this many feed entries per call.
+CHANGE_BATCH_SIZE = 1000
+# Gaps in change_id older than this many changes are treated as rolled-back writes.
+CHANGE_GAP_WINDOW = 100
+
+# Result of update_services: rows written, and service ids skipped because their version moved on.
+ServiceUpdateResult = namedtuple("ServiceUpdateResult", ["touched", "conflicts"])
+# Result of bulk_update_services: rows written, and service ids left alone by its guards.
+BulkUpdateResult = namedtuple("BulkUpdateResult", ["touched", "skipped"])
+
+# Statuses a service doesn't leave through a bulk action; reopen one from its detail page.
+CLOSED_STATUSES = ("Completed", "Cancelled")
+
+# Columns the admin dashboard may change on an existing service.
+UPDATABLE_COLUMNS = frozenset({
+    'status', 'assigned_mechanic', 'extra_charges',
+    'charge_description', 'work_done', 'description', 'payment_status'
+})
+
+
+def _decode_service_types(services):
+    for s in services:
+        if isinstance(s.get('service_types'), str):
+            try:
+                s['service_types'] = json.loads(s['service_types'])
+            except:
+                s['service_types'] = []
+    return services
+
+
+def _escape_like(value):
+    """Escape LIKE wildcards; pair with ``ESCAPE '!'`` in the query."""
+    return value.replace("!", "!!").replace("%", "!%").replace("_", "!_")
+
+
+def _build_service_filters(filters):
+    """Translate a filters dict into a WHERE clause fragment list and its parameters.
+
+    Supported keys: start_date, end_date (inclusive dates), statuses (list),
+    payment_statuses (list), vehicle_no_prefix (str), customer_id.
+    """
+    filters = filters or {}
+    clauses, params = [], []
+    if filters.get("customer_id") is not None:
+        clauses.append("s.customer_id = %s")
+        params.append(filters["customer_id"])
+    if filters.get("start_date"):
+        clauses.append("s.request_date >= %s")
+        params.append(datetime.combine(filters["start_date"], time.min))
+    if filters.get("end_date"):
+        clauses.append("s.request_date < %s")
+        params.append(datetime.combine(filters["end_date"] + timedelta(days=1), time.min))
+    statuses = [status for status in filters.get("statuses") or [] if status]
+    if statuses:
+        clauses.append(f"s.status IN ({', '.join(['%s'] * len(statuses))})")
+        params.extend(statuses)
+    payment_statuses = [ps for ps in filters.get("payment_statuses") or [] if ps]
+    if payment_statuses:
+        clauses.append(f"s.payment_status IN ({', '.join(['%s'] * len(payment_statuses))})")
+        params.extend(payment_statuses)
+    prefix = (filters.get("vehicle_no_prefix") or "").strip()
+    if prefix:
+        clauses.append("v.vehicle_no LIKE %s ESCAPE '!'")
+        params.append(_escape_like(prefix.upper()) + "%")
+    return clauses, params
+
+
+def _record_changes(cur, service_ids):
+    """Append the services' current versions to the service_changes feed.
+
+    Call inside the transaction that wrote the services so the feed never runs ahead of them.
+    """
+    cur.executemany("""
+        INSERT INTO service_changes (service_id, version)
+        SELECT service_id, version FROM services WHERE service_id = %s
+    """, [(service_id,) for service_id in service_ids])
+
+
+def _fetch_keyset_page(cur, select, clauses, params, after_cursor, limit):
+    """Run select + filters ordered newest first, one page past after_cursor.
+
+    Returns (rows, next_cursor); next_cursor is None on the last page.
+    """
+    clauses, params = list(clauses), list(params)
+    if after_cursor:
+        last_date, last_id = after_cursor
+        clauses.append("(s.request_date < %s OR (s.request_date = %s AND s.service_id < %s))")
+        params.extend([last_date, last_date, last_id])
+    where = f" WHERE {' AND '.join(clauses)}" if clauses else ""
+    cur.execute(
+        select + where + " ORDER BY s.request_date DESC, s.service_id DESC LIMIT %s",
+        params + [limit + 1]
+    )
+    rows = cur.fetchall()
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        next_cursor = (rows[-1]["request_date"], rows[-1]["service_id"])
+    return rows, next_cursor
+
 
 class ServiceManager:
 
+    @staticmethod
+    def _insert_service(cur, service_data):
+        service_types_json = json.dumps(service_data.get("service_types", []))
+        cur.execute("""
+            INSERT INTO services (
+                customer_id, vehicle_id, service_types,
+                description, pickup_required, pickup_address,
+                service_date, status, assigned_mechanic,
+                payment_status, base_cost, extra_charges,
+                charge_description, work_done, request_date,
+                updated_at, version
+            ) VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, CURRENT_TIMESTAMP, 1)
+        """, (
+            service_data["customer_id"],
+            service_data["vehicle_id"],
+            service_types_json,
+            service_data.get("description"),
+            service_data.get("pickup_required"),
+            service_data.get("pickup_address"),
+            service_data.get("service_date"),
+            service_data.get("status", "Pending"),
+            service_data.get("assigned_mechanic"),
+            service_data.get("payment_status", "Pending"),
+            service_data.get("base_cost", 0),
+            service_data.get("extra_charges", 0),
+            service_data.get("charge_description"),
+            service_data.get("work_done"),
+            service_data.get("request_date")
+        ))
+        service_id = cur.lastrowid
+        _record_changes(cur, [service_id])
+        return service_id
+
     @db_exception_handler
     def save_service(self, service_data):
+        with db_manager.transaction() as conn, conn.cursor() as cur:
+            service_id = self._insert_service(cur, service_data)
+            apply_rollup_changes(cur, {}, [service_id])
+        query_cache.invalidate("services")
+        return service_id
+
+    @db_exception_handler
+    def create_booking(self, service_data, line_items):
+        """Insert a service and its service_types rows atomically.
+
+        line_items is a list of {"service_name", "price"} dicts. Returns the new service_id.
+        """
+        with db_manager.transaction() as conn, conn.cursor() as cur:
+            service_id = self._insert_service(cur, service_data)
+            if line_items:
+                cur.executemany("""
+                    INSERT INTO service_types (service_id, service_name, price)
+                    VALUES (%s, %s, %s)
+                """, [(service_id, item["service_name"], item.get("price", 0)) for item in line_items])
+            apply_rollup_changes(cur, {}, [service_id])
+        query_cache.invalidate("services")
+        return service_id
+
+    @db_exception_handler
+    def fetch_all_services(self):
+        with db_manager.get_connection() as conn, conn.cursor() as cur:
+            cur.execute(ADMIN_SERVICE_SELECT + " ORDER BY s.request_date DESC")
+            return _decode_service_types(cur.fetchall())
+
+    @db_exception_handler
+    def current_change_token(self):
+        """Token for "now" in the service change feed; pass it to changes_since later.
+
+        Backed off by CHANGE_GAP_WINDOW so writes still committing are not skipped;
+        the first changes_since call may replay a few already-seen changes.
+        """
+        with db_manager.get_connection() as conn, conn.cursor() as cur:
+            cur.execute("SELECT COALESCE(MAX(change_id), 0) AS token FROM service_changes")
+            return max(int(cur.fetchone()["token"]) - CHANGE_GAP_WINDOW, 0)
+
+    @db_exception_handler
+    def changes_since(self, token, limit=CHANGE_BATCH_SIZE, only_ids=None):
+        """Services written since token, as (rows, new_token).
+
+        rows are the current admin rows (ADMIN_SERVICE_SELECT) of each changed service,
+        oldest change first; apply them idempotently by service_id. With only_ids, rows
+        are fetched just for changed services in that collection. Keep calling with
+        new_token until it stops changing to get the rest.
+
+        A change_id is allocated before its transaction commits, so a lower id can still
+        appear after a higher one. new_token therefore stops before the first gap in the
+        ids, unless the gap is more than CHANGE_GAP_WINDOW changes old (a rolled-back
+        write). Changes after a gap may be returned again on the next call.
+        """
         with db_manager.get_connection() as conn, conn.cursor() as cur:
-            service_types_json = json.dumps(service_data.get("service_types", []))
             cur.execute("""
-                INSERT INTO services (
-                    customer_id, vehicle_id, service_types,
-                    description, pickup_required, pickup_address,
-                    service_date, status, assigned_mechanic,
-                    payment_status, base_cost, extra_charges,
-                    charge_description, work_done, request_date
-                ) VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
-            """, (
-                service_data["customer_id"],
-                service_data["vehicle_id"],
-                service_types_json,
-                service_data.get("description"),
-                service_data.get("pickup_required"),
-                service_data.get("pickup_address"),
-                service_data.get("service_date"),
-                service_data.get("status", "Pending"),
-                service_data.get("assigned_mechanic"),
-                service_data.get("payment_status", "Pending"),
-                service_data.get("base_cost", 0),
-                service_data.get("extra_charges", 0),
-                service_data.get("charge_description"),
-                service_data.get("work_done"),
-                service_data.get("request_date")
-            ))
-            return cur.lastrowid
+                SELECT change_id, service_id FROM service_changes
+                WHERE change_id > %s ORDER BY change_id LIMIT %s
+            """, (token, limit))
+            changes = cur.fetchall()
+            if not changes:
+                return [], token
+            newest, new_token = changes[-1]["change_id"], token
+            for change in changes:
+                change_id = change["change_id"]
+                if change_id != new_token + 1 and newest - change_id < CHANGE_GAP_WINDOW:
+                    break  # an earlier change may still be committing
+                new_token = change_id
+            service_ids = list(dict.fromkeys(c["service_id"] for c in changes))
+            if only_ids is not None:
+                service_ids = [i for i in service_ids if i in only_ids]
+            if not service_ids:
+                return [], new_token
+            cur.execute(
+                ADMIN_SERVICE_SELECT + f" WHERE s.service_id IN ({', '.join(['%s'] * len(service_ids))})",
+                service_ids
+            )
+            by_id = {row["service_id"]: row for row in cur.fetchall()}
+        return _decode_service_types([by_id[i] for i in service_ids if i in by_id]), new_token
+
+    @query_cache.cached("services", "users", "vehicles")
+    def get_service(self, service_id):
+        """Fetch one service by primary key with the same joins as fetch_all_services."""
+        return self.fetch_service(service_id)
 
     @db_exception_handler
-    def fetch_all_services(self):
+    def fetch_service(self, service_id):
+        """Uncached get_service, for re-reading a row after a version conflict.
+
+        Another process's writes don't invalidate this process's cache, so the cached
+        copy can carry a version up to the services TTL old.
+        """
         with db_manager.get_connection() as conn, conn.cursor() as cur:
-            query = """
-                SELECT s.*, u.full_name AS customer_name, u.email AS customer_email, u.phone AS customer_phone,
-                       v.vehicle_type, v.vehicle_brand, v.vehicle_model, v.vehicle_no
-                FROM services s
-                JOIN users u ON s.customer_id = u.id
-                JOIN vehicles v ON s.vehicle_id = v.vehicle_id
-                ORDER BY s.request_date DESC
-            """
-            cur.execute(query)
-            services = cur.fetchall()
-            for s in services:
-                if isinstance(s.get('service_types'), str):
-                    try:
-                        s['service_types'] = json.loads(s['service_types'])
-                    except:
-                        s['service_types'] = []
-            return services
+            cur.execute(ADMIN_SERVICE_SELECT + " WHERE s.service_id = %s", (service_id,))
+            service = cur.fetchone()
+        return _decode_service_types([service])[0] if service else None
+
+    @db_exception_handler
+    def query_services(self, filters=None, after_cursor=None, limit=50):
+        """Fetch one page of services matching filters, newest first.
+
+        Pages are keyset-paginated on (request_date, service_id): pass the returned
+        cursor back as after_cursor to get the next page. Returns (rows, next_cursor),
+        where next_cursor is None on the last page.
+        """
+        clauses, params = _build_service_filters(filters)
+        with db_manager.get_connection() as conn, conn.cursor() as cur:
+            rows, next_cursor = _fetch_keyset_page(
+                cur, ADMIN_SERVICE_SELECT, clauses, params, after_cursor, limit
+            )
+        return _decode_service_types(rows), next_cursor
+
+    @db_exception_handler
+    def count_services(self, filters=None):
+        """Count services matching the same filters accepted by query_services."""
+        clauses, params = _build_service_filters(filters)
+        where = f" WHERE {' AND '.join(clauses)}" if clauses else ""
+        join = " JOIN vehicles v ON s.vehicle_id = v.vehicle_id" if any("v." in c for c in clauses) else ""
+        with db_manager.get_connection() as conn, conn.cursor() as cur:
+            cur.execute(f"SELECT COUNT(*) AS total FROM services s{join}{where}", params)
+            return cur.fetchone()["total"]
 
     @db_exception_handler
     def get_services_by_customer_id(self, customer_id):
@@ -69,14 +288,143 @@ class ServiceManager:
                 ORDER BY s.request_date DESC
             """
             cur.execute(query, (customer_id,))
-            services = cur.fetchall()
-            for s in services:
-                if isinstance(s.get('service_types'), str):
-                    try:
-                        s['service_types'] = json.loads(s['service_types'])
-                    except:
-                        s['service_types'] = []
-            return services
+            return _decode_service_types(cur.fetchall())
+
+    @db_exception_handler
+    def query_customer_services(self, customer_id, filters=None, after_cursor=None, limit=20):
+        """One keyset page of a customer's services as summary rows, newest first.
+
+        Accepts the same filters as query_services (status and payment status are
+        filtered in SQL). Fetch full details for a row with get_service.
+        Returns (rows, next_cursor).
+        """
+        clauses, params = _build_service_filters(dict(filters or {}, customer_id=customer_id))
+        with db_manager.get_connection() as conn, conn.cursor() as cur:
+            return _fetch_keyset_page(cur, """
+                SELECT s.service_id, s.customer_id, s.status, s.payment_status, s.base_cost,
+                       s.extra_charges, s.Paid, s.service_date, s.request_date, v.vehicle_no
+                FROM services s
+                JOIN vehicles v ON s.vehicle_id = v.vehicle_id
+            """, clauses, params, after_cursor, limit)
+
+    @db_exception_handler
+    def update_services(self, updates, expected_versions=None):
+        """Apply {service_id: {column: value}} updates in one transaction.
+
+        Without expected_versions, services that change the same set of columns share
+        one executemany batch. With expected_versions ({service_id: version}) each row
+        is only updated while its version still matches; the others are left untouched
+        and reported as conflicts. Returns ServiceUpdateResult(touched, conflicts).
+        """
+        batches = {}
+        for service_id, fields in updates.items():
+            unknown = set(fields) - UPDATABLE_COLUMNS
+            if unknown:
+                raise ValueError(f"Cannot update service columns: {', '.join(sorted(unknown))}")
+            if fields:
+                columns = tuple(sorted(fields))
+                batches.setdefault(columns, []).append(
+                    [fields[c] for c in columns] + [service_id]
+                )
+        if not batches:
+            return ServiceUpdateResult(0, [])
+        touched, updated, conflicts = 0, [], []
+        with db_manager.transaction() as conn, conn.cursor() as cur:
+            before = rollup_snapshot(cur, [row[-1] for rows in batches.values() for row in rows])
+            for columns, rows in batches.items():
+                set_clause = ", ".join(f"{c} = %s" for c in columns)
+                sql = f"""
+                    UPDATE services
+                    SET {set_clause}, updated_at = CURRENT_TIMESTAMP, version = version + 1
+                    WHERE service_id = %s
+                """
+                if expected_versions is None:
+                    cur.executemany(sql, rows)
+                    touched += cur.rowcount
+                    updated.extend(row[-1] for row in rows)
+                    continue
+                for row in rows:
+                    service_id = row[-1]
+                    cur.execute(sql + " AND version = %s", row + [expected_versions[service_id]])
+                    if cur.rowcount:
+                        touched += cur.rowcount
+                        updated.append(service_id)
+                    else:
+                        conflicts.append(service_id)
+            if updated:
+                _record_changes(cur, updated)
+                apply_rollup_changes(cur, before, updated)
+        query_cache.invalidate("services")
+        return ServiceUpdateResult(touched, conflicts)
+
+    @db_exception_handler
+    def bulk_update_services(self, service_ids, fields, skip_statuses=()):
+        """Set the same fields on every service in service_ids with one UPDATE ... IN.
+
+        Services whose current status is in skip_statuses, or that already hold every
+        value in fields, are left alone. Runs in one transaction together with the
+        change feed and rollup refresh. Returns BulkUpdateResult(touched, skipped).
+        """
+        unknown = set(fields) - UPDATABLE_COLUMNS
+        if unknown:
+            raise ValueError(f"Cannot update service columns: {', '.join(sorted(unknown))}")
+        service_ids = list(dict.fromkeys(service_ids))
+        if not service_ids or not fields:
+            return BulkUpdateResult(0, [])
+        columns = sorted(fields)
+        set_clause = ", ".join(f"{c} = %s" for c in columns)
+        with db_manager.transaction() as conn, conn.cursor() as cur:
+            # The snapshot locks the rows, so the guards below hold until the UPDATE.
+            before = rollup_snapshot(cur, service_ids)
+            select = ", ".join(["service_id", "status", *(c for c in columns if c != "status")])
+            cur.execute(
+                f"SELECT {select} FROM services WHERE service_id IN ({', '.join(['%s'] * len(service_ids))})",
+                service_ids
+            )
+            current = {row["service_id"]: row for row in cur.fetchall()}
+            updated = [
+                service_id for service_id in service_ids
+                if service_id in current
+                and current[service_id]["status"] not in skip_statuses
+                and any(current[service_id][c] != fields[c] for c in columns)
+            ]
+            skipped = [service_id for service_id in service_ids if service_id not in updated]
+            touched = 0
+            if updated:
+                cur.execute(f"""
+                    UPDATE services
+                    SET {set_clause}, updated_at = CURRENT_TIMESTAMP, version = version + 1
+                    WHERE service_id IN ({', '.join(['%s'] * len(updated))})
+                """, [fields[c] for c in columns] + updated)
+                touched = cur.rowcount
+                _record_changes(cur, updated)
+                apply_rollup_changes(cur, before, updated)
+        query_cache.invalidate("services")
+        return BulkUpdateResult(touched, skipped)
+
+    @query_cache.cached("services")
+    @db_exception_handler
+    def get_statistics(self, date_range=None):
+        """Service counts by status and paid revenue, optionally within (start, end) dates.
+
+        Read from daily_service_rollup; cached until the next write to services.
+        """
+        where, params = "", []
+        if date_range:
+            where, params = " WHERE day >= %s AND day <= %s", list(date_range)
+        with db_manager.get_connection() as conn, conn.cursor() as cur:
+            cur.execute(f"""
+                SELECT status, SUM(services) AS total, SUM(paid) AS revenue
+                FROM daily_service_rollup{where}
+                GROUP BY status
+            """, params)
+            rows = cur.fetchall()
+        by_status = {r["status"]: int(r["total"]) for r in rows}
+        return {
+            "total": sum(by_status.values()),
+            "by_status": by_status,
+            "revenue": int(sum(r["revenue"] or 0 for r in rows)),
+        }
 
     @db_exception_handler
     def save_service_type(self, service_type_data):
@@ -1,11 +1,14 @@
 # users.py
 import pymysql
+from .cache import query_cache
 from .connection import db_manager
 from .exception_handler import db_exception_handler
 
 class UserService:
     """Handles all user-related database operations."""
 
+    PUBLIC_COLUMNS = "id, full_name, email, phone, user_type"
+
     @db_exception_handler
     def fetch_all_users(self):
         """Get all users ordered by name."""
@@ -32,16 +35,78 @@ class UserService:
                     user_data['password'],
                     user_data.get('user_type', 'Customer')
                 ))
-                return cur.lastrowid
+                user_id = cur.lastrowid
             except pymysql.IntegrityError as e:
                 if "Duplicate entry" in str(e) and "email" in str(e):
                     raise Exception("Email already exists.")
                 else:
                     raise
+        query_cache.invalidate("users")
+        return user_id
 
     @db_exception_handler
     def get_user_by_email(self, email):
-        """Retrieve a user by email."""
+        """Retrieve a user by email, including the password for credential checks."""
         with db_manager.get_connection() as conn, conn.cursor() as cur:
             cur.execute("SELECT * FROM users WHERE email = %s", (email,))
             return cur.fetchone()
+
+    @db_exception_handler
+    def get_user_by_id(self, user_id):
+        """Retrieve a user by primary key, without the password."""
+        with db_manager.get_connection() as conn, conn.cursor() as cur:
+            cur.execute(f"SELECT {self.PUBLIC_COLUMNS} FROM users WHERE id = %s", (user_id,))
+            return cur.fetchone()
+
+    @db_exception_handler
+    def get_user_by_phone(self, phone):
+        """Retrieve a user by phone number, without the password."""
+        with db_manager.get_connection() as conn, conn.cursor() as cur:
+            cur.execute(f"SELECT {self.PUBLIC_COLUMNS} FROM users WHERE phone = %s LIMIT 1", (phone,))
+            return cur.fetchone()
+
+    @db_exception_handler
+    def get_user_by_email_and_phone(self, email, phone):
+        """Retrieve the user matching both email and phone, without the password."""
+        with db_manager.get_connection() as conn, conn.cursor() as cur:
+            cur.execute(
+                f"SELECT {self.PUBLIC_COLUMNS} FROM users WHERE email = %s AND phone = %s",
+                (email, phone)
+            )
+            return cur.fetchone()
+
+    @db_exception_handler
+    def find_conflicting_users(self, full_name, email, phone):
+        """Return users that already use the given name, email or phone."""
+        with db_manager.get_connection() as conn, conn.cursor() as cur:
+            cur.execute(f"""
+                SELECT {self.PUBLIC_COLUMNS} FROM users WHERE full_name = %s
+                UNION ALL
+                SELECT {self.PUBLIC_COLUMNS} FROM users WHERE email = %s
+                UNION ALL
+                SELECT {self.PUBLIC_COLUMNS} FROM users WHERE phone = %s
+            """, (full_name, email, phone))
+            return cur.fetchall()
+
+    @db_exception_handler
+    def update_password(self, email, phone, new_password):
+        """Set a new password for the user identified by email and phone."""
+        with db_manager.get_connection() as conn, conn.cursor() as cur:
+            cur.execute(
+                "UPDATE users SET password = %s WHERE email = %s AND phone = %s",
+                (new_password, email, phone)
+            )
+            return cur.rowcount > 0
+
+    def get_session_user(self, email):
+        """Return the logged-in user's record (no password) from the shared query cache."""
+        if not email:
+            return None
+        return self._fetch_session_user(email.strip().lower())
+
+    @query_cache.cached("users")
+    @db_exception_handler
+    def _fetch_session_user(self, email):
+        with db_manager.get_connection() as conn, conn.cursor() as cur:
+            cur.execute(f"SELECT {self.PUBLIC_COLUMNS} FROM users WHERE email = %s", (email,))
+            return cur.fetchone()
@@ -1,11 +1,17 @@
 # vehicles.py
 import pymysql
+from .cache import query_cache
 from .connection import db_manager
 from .exception_handler import db_exception_handler
 
+# Rows per executemany round-trip in add_vehicles.
+VEHICLE_INSERT_BATCH = 500
+
+
 class VehicleService:
     """Handles vehicle-related database operations."""
 
+    @query_cache.cached("vehicles")
     @db_exception_handler
     def fetch_vehicles_by_user(self, user_id):
         """Get all vehicles for a specific user."""
@@ -32,9 +38,49 @@ class VehicleService:
                     vehicle_data["vehicle_model"],
                     vehicle_data["vehicle_no"].upper()
                 ))
-                return cur.lastrowid
+                vehicle_id = cur.lastrowid
             except pymysql.IntegrityError as e:
                 if "Duplicate entry" in str(e):
                     raise Exception("Vehicle number already exists.")
                 else:
                     raise
+        query_cache.invalidate("vehicles")
+        return vehicle_id
+
+    @db_exception_handler
+    def existing_vehicle_numbers(self, vehicle_nos):
+        """The subset of vehicle_nos already registered, found with one IN query."""
+        vehicle_nos = list(dict.fromkeys(vehicle_nos))
+        if not vehicle_nos:
+            return set()
+        with db_manager.get_connection() as conn, conn.cursor() as cur:
+            cur.execute(
+                f"SELECT vehicle_no FROM vehicles WHERE vehicle_no IN ({', '.join(['%s'] * len(vehicle_nos))})",
+                vehicle_nos
+            )
+            return {row["vehicle_no"].upper() for row in cur.fetchall()}
+
+    @db_exception_handler
+    def add_vehicles(self, user_id, vehicles):
+        """Insert many vehicles for a user in one transaction; all or none are added.
+
+        vehicles is a list of dicts with the same keys as add_users_vehicle takes.
+        Returns the number of vehicles inserted.
+        """
+        rows = [
+            (user_id, v["vehicle_type"], v["vehicle_brand"], v["vehicle_model"], v["vehicle_no"].upper())
+            for v in vehicles
+        ]
+        with db_manager.transaction() as conn, conn.cursor() as cur:
+            try:
+                for start in range(0, len(rows), VEHICLE_INSERT_BATCH):
+                    cur.executemany("""
+                        INSERT INTO vehicles (user_id, vehicle_type, vehicle_brand, vehicle_model, vehicle_no)
+                        VALUES (%s, %s, %s, %s, %s)
+                    """, rows[start:start + VEHICLE_INSERT_BATCH])
+            except pymysql.IntegrityError as e:
+                if "Duplicate entry" in str(e):
+                    raise Exception("A vehicle number was registered while importing; nothing was added.")
+                raise
+        query_cache.invalidate("vehicles")
+        return len(rows)
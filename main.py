@@ -1,4 +1,5 @@
 import streamlit as st
+from profiling import render_profiler
 
 class VehicleServiceApp:
     def __init__(self):
@@ -23,13 +24,16 @@ class VehicleServiceApp:
         try:
             mod_name = self.page_modules.get(page, "screens.home")
             module = __import__(mod_name, fromlist=["main"])
-            module.main()
+            with render_profiler.profile(page):
+                module.main()
         except Exception as e:
             st.error(f"An error occurred: {str(e)}")
             st.info("Please try refreshing the page or contact support if the problem persists.")
             if st.button("🏠 Go to Home"):
                 st.session_state.page = "home"
                 st.rerun()
+        if render_profiler.enabled and st.session_state.get("user_type") == "Admin":
+            render_profiler.show_overlay()
 
 if __name__ == "__main__":
     st.set_page_config(
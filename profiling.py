@@ -0,0 +1,132 @@
+import cProfile
+import heapq
+import os
+import re
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+import streamlit as st
+from database.exception_handler import thread_db_totals
+
+# Opt-in: MOTORMATES_PROFILE=1 streamlit run main.py
+PROFILE_ENABLED = os.environ.get("MOTORMATES_PROFILE") == "1"
+# cProfile dumps of the slowest PROFILE_KEEP_SLOWEST reruns are kept in PROFILE_DIR.
+PROFILE_DIR = os.environ.get("MOTORMATES_PROFILE_DIR", "profiles")
+PROFILE_KEEP_SLOWEST = int(os.environ.get("MOTORMATES_PROFILE_KEEP", "10"))
+PROFILE_CAPTURE = os.environ.get("MOTORMATES_PROFILE_CAPTURE", "1") == "1"
+HISTORY_PER_PAGE = 200
+
+
+def _percentile(values, q):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(q * len(ordered)))] if ordered else 0.0
+
+
+class RenderProfiler:
+    """Times each page render, splitting DB time from everything else (widget emission)."""
+
+    def __init__(self, enabled=PROFILE_ENABLED, capture=PROFILE_CAPTURE,
+                 profile_dir=PROFILE_DIR, keep_slowest=PROFILE_KEEP_SLOWEST):
+        self.enabled = enabled
+        self.capture = capture
+        self.profile_dir = profile_dir
+        self.keep_slowest = keep_slowest
+        self._history = {}
+        self._slowest = []  # min-heap of (wall_seconds, dump_path)
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def profile(self, page):
+        if not self.enabled:
+            yield
+            return
+        db_start, calls_start = thread_db_totals()
+        profiler = cProfile.Profile() if self.capture else None
+        if profiler is not None:
+            try:
+                profiler.enable()
+            except ValueError:
+                # Another session's render holds the interpreter-wide profiler hook.
+                profiler = None
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            wall = time.perf_counter() - start
+            if profiler is not None:
+                profiler.disable()
+            db_end, calls_end = thread_db_totals()
+            self._record(page, wall, db_end - db_start, calls_end - calls_start, profiler)
+
+    def _record(self, page, wall, db_seconds, db_calls, profiler):
+        timing = {
+            "page": page,
+            "wall_ms": round(wall * 1000, 1),
+            "db_ms": round(db_seconds * 1000, 1),
+            "render_ms": round((wall - db_seconds) * 1000, 1),
+            "db_calls": db_calls,
+        }
+        with self._lock:
+            self._history.setdefault(page, deque(maxlen=HISTORY_PER_PAGE)).append(timing)
+            keep = profiler is not None and self.keep_slowest > 0 and (
+                len(self._slowest) < self.keep_slowest or wall > self._slowest[0][0]
+            )
+        if keep:
+            self._save_profile(page, wall, profiler)
+        st.session_state["_last_render_timing"] = timing
+
+    def _save_profile(self, page, wall, profiler):
+        os.makedirs(self.profile_dir, exist_ok=True)
+        safe_page = re.sub(r"[^A-Za-z0-9_-]", "_", page)
+        path = os.path.join(
+            self.profile_dir, f"{time.strftime('%Y%m%d-%H%M%S')}-{safe_page}-{int(wall * 1000)}ms.prof"
+        )
+        profiler.dump_stats(path)
+        with self._lock:
+            heapq.heappush(self._slowest, (wall, path))
+            evicted = heapq.heappop(self._slowest) if len(self._slowest) > self.keep_slowest else None
+        if evicted:
+            try:
+                os.remove(evicted[1])
+            except OSError:
+                pass
+
+    def summary(self):
+        """Per-page render statistics in milliseconds, slowest p95 first."""
+        with self._lock:
+            history = {page: list(timings) for page, timings in self._history.items()}
+        rows = []
+        for page, timings in history.items():
+            walls = [t["wall_ms"] for t in timings]
+            rows.append({
+                "page": page,
+                "renders": len(timings),
+                "p50_ms": _percentile(walls, 0.5),
+                "p95_ms": _percentile(walls, 0.95),
+                "max_ms": max(walls),
+                "avg_db_ms": round(sum(t["db_ms"] for t in timings) / len(timings), 1),
+                "avg_db_calls": round(sum(t["db_calls"] for t in timings) / len(timings), 1),
+            })
+        return sorted(rows, key=lambda r: r["p95_ms"], reverse=True)
+
+    def show_overlay(self):
+        """Debug panel in the sidebar with the last render and per-page history."""
+        last = st.session_state.get("_last_render_timing")
+        with st.sidebar.expander("⏱️ Render Profile", expanded=False):
+            if last:
+                st.caption(
+                    f"Last render of **{last['page']}**: {last['wall_ms']} ms "
+                    f"(DB {last['db_ms']} ms in {last['db_calls']} calls, "
+                    f"widgets/other {last['render_ms']} ms)"
+                )
+            st.dataframe(self.summary(), hide_index=True, use_container_width=True)
+            with self._lock:
+                slowest = sorted(self._slowest, reverse=True)
+            if slowest:
+                st.caption("Slowest captured profiles:")
+                for wall, path in slowest:
+                    st.text(f"{wall * 1000:.0f} ms  {path}")
+
+
+render_profiler = RenderProfiler()
@@ -1,3 +1,5 @@
+import numpy as np
+import pandas as pd
 import streamlit as st
 from utils import display_alert
 from database.vehicles import VehicleService
@@ -39,6 +41,103 @@ def validate_vehicle_form(vehicle_no, vtype, brand, model):
     return errors
 
 
+# Columns a bulk import file must have, one vehicle per row.
+IMPORT_COLUMNS = ["vehicle_no", "vehicle_type", "vehicle_brand", "vehicle_model"]
+IMPORT_MAX_ROWS = 5000
+
+_VALID_BRANDS = pd.MultiIndex.from_tuples(
+    [(vtype, brand) for vtype, cfg in VEHICLE_CONFIG.items() for brand in cfg["brands"]]
+)
+_VALID_MODELS = pd.MultiIndex.from_tuples(
+    [(vtype, brand, model) for vtype, cfg in VEHICLE_CONFIG.items()
+     for brand, models in cfg["models"].items() for model in models]
+)
+
+
+def read_vehicle_file(uploaded):
+    """Read an uploaded CSV or XLSX into a DataFrame of stripped strings.
+
+    Blank rows are dropped; the "line" column keeps each row's line number in the file.
+    """
+    if uploaded.name.lower().endswith(".xlsx"):
+        frame = pd.read_excel(uploaded, dtype=str)  # needs openpyxl
+    else:
+        frame = pd.read_csv(uploaded, dtype=str, skip_blank_lines=False)
+    frame.columns = [str(c).strip().lower().replace(" ", "_") for c in frame.columns]
+    missing = [c for c in IMPORT_COLUMNS if c not in frame.columns]
+    if missing:
+        raise ValueError(f"Missing columns: {', '.join(missing)}")
+    frame = frame[IMPORT_COLUMNS].fillna("")
+    for column in IMPORT_COLUMNS:
+        frame[column] = frame[column].str.strip()
+    frame["vehicle_no"] = frame["vehicle_no"].str.upper()
+    frame.insert(0, "line", frame.index + 2)  # header is line 1
+    return frame[frame[IMPORT_COLUMNS].ne("").any(axis=1)].reset_index(drop=True)
+
+
+def validate_vehicle_frame(frame, existing_vehicle_nos):
+    """Vectorized validate_vehicle_form over every row, plus duplicate checks.
+
+    Returns a copy of frame (which carries read_vehicle_file's "line" column) with an
+    "errors" column that is empty for rows that can be imported.
+    """
+    has_no = frame["vehicle_no"].ne("")
+    checks = [
+        (~has_no, "Vehicle number is required."),
+        (~frame["vehicle_type"].isin(list(VEHICLE_CONFIG)), "Invalid vehicle type."),
+        (~pd.MultiIndex.from_frame(frame[["vehicle_type", "vehicle_brand"]]).isin(_VALID_BRANDS),
+         "Invalid brand."),
+        (~pd.MultiIndex.from_frame(frame[["vehicle_type", "vehicle_brand", "vehicle_model"]]).isin(_VALID_MODELS),
+         "Invalid model."),
+        (has_no & frame["vehicle_no"].duplicated(keep=False), "Vehicle number repeated in file."),
+        (frame["vehicle_no"].isin(existing_vehicle_nos), "Vehicle number already registered."),
+    ]
+    errors = pd.Series("", index=frame.index)
+    for mask, message in checks:
+        errors = errors + np.where(mask, message + " ", "")
+    report = frame.copy()
+    report["errors"] = errors.str.strip()
+    return report
+
+
+def bulk_import_section(user):
+    """Upload a CSV/XLSX of vehicles, show a per-row report and insert the valid rows."""
+    with st.expander("📥 Import many vehicles (CSV / XLSX)"):
+        st.caption(f"One vehicle per row with columns: {', '.join(IMPORT_COLUMNS)}.")
+        uploaded = st.file_uploader("Vehicle file", type=["csv", "xlsx"], key="vehicle_import_file")
+        if uploaded is None:
+            return
+        try:
+            frame = read_vehicle_file(uploaded)
+        except ImportError:
+            display_alert("❌ Reading .xlsx files needs the openpyxl package; upload a CSV instead.", "error")
+            return
+        except Exception as e:
+            display_alert(f"❌ Could not read {uploaded.name}: {e}", "error")
+            return
+        if len(frame) > IMPORT_MAX_ROWS:
+            display_alert(f"❌ {len(frame)} rows; import at most {IMPORT_MAX_ROWS} at a time.", "error")
+            return
+
+        existing = VehicleService().existing_vehicle_numbers(frame["vehicle_no"][frame["vehicle_no"].ne("")].tolist())
+        if existing is None:
+            return
+        report = validate_vehicle_frame(frame, existing)
+        valid = report[report["errors"].eq("")]
+        invalid = report[report["errors"].ne("")]
+        st.write(f"✅ {len(valid)} valid, ❌ {len(invalid)} with errors")
+        if len(invalid):
+            st.dataframe(invalid, hide_index=True, use_container_width=True)
+            st.download_button(
+                "⬇️ Download error report", invalid.to_csv(index=False),
+                file_name="vehicle_import_errors.csv", mime="text/csv", on_click="ignore",
+            )
+        if len(valid) and st.button(f"Import {len(valid)} valid vehicles", key="vehicle_import_submit"):
+            added = VehicleService().add_vehicles(user.id, valid[IMPORT_COLUMNS].to_dict("records"))
+            if added:
+                display_alert(f"🚗 {added} vehicles added successfully!", "success")
+
+
 def add_vehicle_page(user):
     """Display the add vehicle page"""
     col1, col2, col3 = st.columns([1,2,1])
@@ -81,6 +180,8 @@ def add_vehicle_page(user):
                 else:
                     display_alert("❌ Failed to add vehicle. Vehicle number might already exist.", "error")
 
+        bulk_import_section(user)
+
 
 def get_vehicle_config():
     """Return the vehicle configuration dictionary"""
@@ -1,9 +1,42 @@
+import altair as alt
+import pandas as pd
+import tempfile
 import streamlit as st
-from datetime import datetime, date
-from utils import global_css
-from database.services import ServiceManager as DBServiceManager
+from datetime import date, timedelta
+from utils import global_css, display_alert
+from database.assignments import AssignmentService, plan_assignments
+from database.exports import ExportService, EXPORT_FORMATS
+from database.rollups import RollupService
+from database.services import CLOSED_STATUSES, ServiceManager as DBServiceManager, ServiceUpdateResult, UPDATABLE_COLUMNS
 from database.mechanics import MechanicService
 from database.users import UserService
+from database.exception_handler import metrics
+
+PAGE_SIZES = [25, 50, 100]
+# One st.dataframe instead of an expander per row, so table mode can show far larger pages.
+TABLE_PAGE_SIZES = [100, 500, 2000]
+VIEW_MODES = ["Cards", "Table"]
+STATUS_OPTIONS = ["Pending", "In Progress", "Completed", "Cancelled"]
+BULK_ACTIONS = ["Set status", "Assign mechanic", "Mark cancelled"]
+
+# Trend chart choices: label -> daily_trends dimension / rollup measure.
+TREND_BREAKDOWNS = {"Status": "status", "Vehicle type": "vehicle_type", "Mechanic": "mechanic", "Service": "service"}
+TREND_MEASURES = {"Services": "services", "Billed (₹)": "billed", "Paid (₹)": "paid"}
+TREND_DAYS = 30
+
+EXPORT_MIME_TYPES = {"csv": "text/csv", "parquet": "application/vnd.apache.parquet"}
+# Streamlit serves downloads from memory, so larger exports are left to the CLI.
+EXPORT_DOWNLOAD_MAX_BYTES = 50 * 1024 * 1024
+
+TABLE_COLUMN_CONFIG = {
+    "Service ID": st.column_config.NumberColumn(format="%d"),
+    "Requested": st.column_config.DatetimeColumn(format="YYYY-MM-DD HH:mm"),
+    "Service Date": st.column_config.DateColumn(),
+    "Base": st.column_config.NumberColumn(format="₹%d"),
+    "Extra": st.column_config.NumberColumn(format="₹%d"),
+    "Total": st.column_config.NumberColumn(format="₹%d"),
+    "Paid": st.column_config.NumberColumn(format="₹%d"),
+}
 
 def display_service_type(service_dict):
     """Format service types for display."""
@@ -18,21 +51,58 @@ def display_service_type(service_dict):
     return "N/A"
 
 
+def services_frame(services, mechanic_options):
+    """One column-oriented DataFrame (Arrow-serialised by st.dataframe) for a page of services."""
+    rows = [srv.data for srv in services]
+    base = [d.get('base_cost') or 0 for d in rows]
+    extra = [d.get('extra_charges') or 0 for d in rows]
+    return pd.DataFrame({
+        "Service ID": [d.get('service_id') for d in rows],
+        "Requested": pd.to_datetime([d.get('request_date') for d in rows]),
+        "Service Date": [d.get('service_date') for d in rows],
+        "Customer": [d.get('customer_name') for d in rows],
+        "Vehicle No": [d.get('vehicle_no') for d in rows],
+        "Vehicle": [f"{d.get('vehicle_type', '')} {d.get('vehicle_brand', '')} {d.get('vehicle_model', '')}" for d in rows],
+        "Services": [display_service_type(d) for d in rows],
+        "Status": [d.get('status') for d in rows],
+        "Mechanic": [mechanic_options.get(d.get('assigned_mechanic'), "Not Assigned") for d in rows],
+        "Base": base,
+        "Extra": extra,
+        "Total": [b + e for b, e in zip(base, extra)],
+        "Paid": [d.get('Paid') or 0 for d in rows],
+        "Payment": [d.get('payment_status') for d in rows],
+    })
+
+
 class Service:
     def __init__(self, data):
         self.data = data or {}
+        self._dirty = set()
+
+    def _set(self, field, val):
+        if self.data.get(field) != val:
+            self.data[field] = val
+            self._dirty.add(field)
+
+    @property
+    def is_dirty(self):
+        return bool(self._dirty)
 
     @property
     def service_id(self):
         return self.data.get('service_id')
 
+    @property
+    def version(self):
+        return self.data.get('version')
+
     @property
     def status(self):
         return self.data.get('status', 'Pending')
 
     @status.setter
     def status(self, val):
-        self.data['status'] = val
+        self._set('status', val)
 
     @property
     def payment_status(self):
@@ -44,7 +114,7 @@ class Service:
 
     @assigned_mechanic.setter
     def assigned_mechanic(self, val):
-        self.data['assigned_mechanic'] = val
+        self._set('assigned_mechanic', val)
 
     @property
     def extra_charges(self):
@@ -52,7 +122,7 @@ class Service:
 
     @extra_charges.setter
     def extra_charges(self, val):
-        self.data['extra_charges'] = val
+        self._set('extra_charges', val)
 
     @property
     def charge_description(self):
@@ -60,7 +130,7 @@ class Service:
 
     @charge_description.setter
     def charge_description(self, val):
-        self.data['charge_description'] = val
+        self._set('charge_description', val)
 
     def update_status(self, new_status):
         self.status = new_status
@@ -75,71 +145,123 @@ class Service:
         total_cost = base_cost + extra_charges
         paid_amt = self.data.get('Paid', 0) or 0
         if self.payment_status == "Done" and total_cost > paid_amt:
-            self.data['payment_status'] = 'Pending'
+            self._set('payment_status', 'Pending')
 
     def save_work_description(self, description):
-        self.data['work_done'] = description
+        self._set('work_done', description)
 
     def to_update_dict(self):
-        """Return only updatable fields."""
-        keys = [
-            'status', 'assigned_mechanic', 'extra_charges',
-            'charge_description', 'work_done', 'description', 'payment_status'
-        ]
-        return {k: self.data[k] for k in keys if k in self.data}
+        """Return only the updatable fields changed since the last save."""
+        return {k: self.data[k] for k in self._dirty if k in UPDATABLE_COLUMNS}
+
+    def mark_clean(self):
+        self._dirty.clear()
 
 
 class AdminServiceManager:
+    """Services the admin has opened, loaded by id and kept in session state between reruns."""
+
+    SESSION_KEY = "admin_service_manager"
+
     def __init__(self):
         self.reload_services()
 
+    @classmethod
+    def for_session(cls):
+        """The session's manager, created once and synced incrementally after."""
+        manager = st.session_state.get(cls.SESSION_KEY)
+        if manager is None:
+            manager = st.session_state[cls.SESSION_KEY] = cls()
+        else:
+            manager.sync()
+        return manager
+
     def reload_services(self):
-        try:
-            raw_services = DBServiceManager().fetch_all_services()
-            self.services = [Service(s) for s in raw_services if s]
-        except Exception as e:
-            st.error(f"Failed to reload services: {e}")
-            self.services = []
-
-    def save(self):
-        """Persist updated services to DB."""
-        try:
-            from database.connection import db_manager
-            with db_manager.get_connection() as conn, conn.cursor() as cur:
-                for srv in self.services:
-                    if srv.service_id:
-                        updates = srv.to_update_dict()
-                        if updates:
-                            set_clause = ", ".join(f"{k}=%s" for k in updates)
-                            values = list(updates.values()) + [srv.service_id]
-                            cur.execute(
-                                f"UPDATE services SET {set_clause} WHERE service_id=%s",
-                                values
-                            )
-            st.success("✅ Changes saved successfully.")
-        except Exception as e:
-            st.error(f"Failed to save services: {e}")
+        """Drop every loaded service; each is re-read by id the next time it is used."""
+        self.change_token = DBServiceManager().current_change_token() or 0
+        self._by_id = {}
+
+    def sync(self):
+        """Refresh loaded services changed since the last sync; returns how many were applied."""
+        db, applied = DBServiceManager(), 0
+        while True:
+            result = db.changes_since(self.change_token, only_ids=self._by_id.keys())
+            if result is None:
+                return applied
+            rows, token = result
+            for data in rows:
+                self._replace(Service(data))
+            applied += len(rows)
+            if token == self.change_token:
+                return applied
+            self.change_token = token
+
+    def _replace(self, srv):
+        self._by_id[srv.service_id] = srv
+
+    def save(self, notify=True):
+        """Persist changed services to DB in one transaction.
+
+        Each row is only written if its version is the one loaded; services changed by
+        someone else in the meantime are reloaded and reported in conflicts. Returns
+        ServiceUpdateResult(touched, conflicts), or None on failure.
+        """
+        dirty = [srv for srv in self._by_id.values() if srv.service_id and srv.is_dirty]
+        if not dirty:
+            return ServiceUpdateResult(0, [])
+        result = DBServiceManager().update_services(
+            {srv.service_id: srv.to_update_dict() for srv in dirty},
+            expected_versions={srv.service_id: srv.version for srv in dirty}
+        )
+        if result is None:
+            if notify:
+                st.error("Failed to save services.")
+            return None
+        for srv in dirty:
+            if srv.service_id in result.conflicts:
+                self.refresh(srv.service_id)
+            else:
+                srv.data['version'] = srv.version + 1
+                srv.mark_clean()
+        if notify:
+            saved = len(dirty) - len(result.conflicts)
+            if saved:
+                st.success(f"✅ Saved changes to {saved} service(s).")
+            if result.conflicts:
+                st.warning(
+                    f"⚠️ Service(s) {', '.join(f'#{sid}' for sid in result.conflicts)} were changed by "
+                    "someone else and have been reloaded; re-apply your changes."
+                )
+        return result
 
     def get_by_id(self, service_id):
-        return next((srv for srv in self.services if str(srv.service_id) == str(service_id)), None)
-
-
-class UserManager:
-    def __init__(self):
+        """O(1) lookup of a loaded service, fetching it by primary key if not loaded yet."""
         try:
-            self.users = UserService().fetch_all_users()
-        except Exception as e:
-            st.error(f"Failed to load users: {e}")
-            self.users = []
-
-    def get_user_by_email(self, email):
-        return next((u for u in self.users if u.get('email') == email), None)
+            service_id = int(service_id)
+        except (TypeError, ValueError):
+            return None
+        srv = self._by_id.get(service_id)
+        if srv is None:
+            data = DBServiceManager().get_service(service_id)
+            if not data:
+                return None
+            srv = Service(data)
+            self._replace(srv)
+        return srv
+
+    def refresh(self, service_id):
+        """Re-read one service from the DB, bypassing the query cache, replacing the loaded copy."""
+        data = DBServiceManager().fetch_service(service_id)
+        if not data:
+            return None
+        srv = Service(data)
+        self._replace(srv)
+        return srv
 
 
 class AdminDashboard:
     def __init__(self):
-        self.service_manager = AdminServiceManager()
-        self.user_manager = UserManager()
+        self.service_manager = AdminServiceManager.for_session()
         self.mechanics = MechanicService().fetch_all_mechanics()
         self.mechanic_options = {m['mechanic_id']: m['mechanic_name'] for m in self.mechanics}
 
@@ -160,18 +282,22 @@ class AdminDashboard:
             st.rerun()
 
         self.show_filters_ui()
+        self.show_auto_assign()
+        self.show_trends()
+        self.show_export()
+        self.show_db_metrics()
         self.show_statistics_and_logout()
 
     def welcome_message(self):
         admin_email = st.session_state.get("email", "Admin")
-        admin_user = self.user_manager.get_user_by_email(admin_email)
+        admin_user = UserService().get_session_user(admin_email)
         admin_name = admin_user.get("full_name", admin_email) if admin_user else admin_email
         st.subheader(f"👋 Welcome back, {admin_name}")
 
     def show_filters_ui(self):
         st.header("🔍 Filter Services")
-        total_services = len(self.service_manager.services)
-        st.info(f"📊 Total services in system: {total_services}")
+        stats = DBServiceManager().get_statistics() or {}
+        st.info(f"📊 Total services in system: {stats.get('total', 0)}")
 
         col1, col2, col3, col4 = st.columns(4)
         with col1:
@@ -187,41 +313,67 @@ class AdminDashboard:
             )
         with col4:
             vehicle_number_filter = st.text_input(
-                "Vehicle Number Filter", placeholder="Type vehicle no..."
+                "Vehicle Number Filter", placeholder="Type vehicle no prefix..."
             )
 
-        filtered = self.filter_services(start_date, end_date, status_filter, vehicle_number_filter)
-        self.show_services_list(filtered)
-
-    def filter_services(self, start_date, end_date, status_filter, vehicle_number_filter):
-        def date_in_range(service):
-            try:
-                s_date = service.data.get('request_date')
-                if not s_date:
-                    return True
-                s_date = datetime.strptime(str(s_date), "%Y-%m-%d %H:%M:%S").date()
-                return start_date <= s_date <= end_date
-            except:
-                return True
-
-        def status_match(service):
-            if "All" in status_filter or not status_filter:
-                return True
-            return service.status in status_filter
-
-        def vehicle_no_match(service):
-            if not vehicle_number_filter:
-                return True
-            vehicle_no = service.data.get('vehicle_no', '').lower()
-            return vehicle_number_filter.lower() in vehicle_no
-
-        return [srv for srv in self.service_manager.services if date_in_range(srv) and status_match(srv) and vehicle_no_match(srv)]
-
-    def show_services_list(self, services):
+        filters = self.build_filters(start_date, end_date, status_filter, vehicle_number_filter)
+        col1, col2 = st.columns([1, 3])
+        with col1:
+            view_mode = st.radio("View", VIEW_MODES, horizontal=True, key="admin_view_mode")
+        with col2:
+            page_sizes = TABLE_PAGE_SIZES if view_mode == "Table" else PAGE_SIZES
+            page_size = st.selectbox("Services per page", page_sizes, index=0)
+        services, total, page_no, has_next = self.filter_services(filters, page_size)
+        if view_mode == "Table":
+            self.show_services_table(services, total)
+        else:
+            self.show_services_list(services, total)
+        self.show_pagination(page_no, has_next)
+
+    @staticmethod
+    def build_filters(start_date, end_date, status_filter, vehicle_number_filter):
+        return {
+            "start_date": start_date,
+            "end_date": end_date,
+            "statuses": [] if "All" in status_filter else list(status_filter),
+            "vehicle_no_prefix": vehicle_number_filter.strip(),
+        }
+
+    def filter_services(self, filters, page_size):
+        """Fetch the current page of services for the filters, server-side."""
+        # Cursor stack: cursors[i] is the after_cursor that produces page i.
+        signature = (repr(sorted(filters.items())), page_size)
+        if st.session_state.get('admin_page_signature') != signature:
+            st.session_state['admin_page_signature'] = signature
+            st.session_state['admin_page_cursors'] = [None]
+        cursors = st.session_state['admin_page_cursors']
+
+        db = DBServiceManager()
+        result = db.query_services(filters, after_cursor=cursors[-1], limit=page_size)
+        rows, next_cursor = result if result else ([], None)
+        st.session_state['admin_next_cursor'] = next_cursor
+        total = db.count_services(filters) or 0
+        return [Service(r) for r in rows], total, len(cursors), next_cursor is not None
+
+    def show_pagination(self, page_no, has_next):
+        cursors = st.session_state['admin_page_cursors']
+        col1, col2, col3 = st.columns([1, 2, 1])
+        with col1:
+            if st.button("⬅️ Previous", disabled=page_no <= 1):
+                cursors.pop()
+                st.rerun()
+        with col2:
+            st.markdown(f"<div style='text-align:center'>Page {page_no}</div>", unsafe_allow_html=True)
+        with col3:
+            if st.button("Next ➡️", disabled=not has_next):
+                cursors.append(st.session_state['admin_next_cursor'])
+                st.rerun()
+
+    def show_services_list(self, services, total):
         if not services:
             st.warning("❌ No services found for selected filters.")
             return
-        st.success(f"✅ Found {len(services)} services")
+        st.success(f"✅ Found {total} services")
         for i, srv in enumerate(services):
             d = srv.data
             service_id = d.get('service_id', f'temp_{i}')
@@ -259,6 +411,74 @@ class AdminDashboard:
                     st.session_state['current_service'] = service_id
                     st.rerun()
 
+    def show_services_table(self, services, total):
+        if not services:
+            st.warning("❌ No services found for selected filters.")
+            return
+        bulk = st.toggle("Bulk actions", key="admin_bulk_mode")
+        hint = "select services to change together" if bulk else "select a row to open it"
+        st.success(f"✅ Found {total} services — {hint}")
+        frame = services_frame(services, self.mechanic_options)
+        # A fresh key after each open or bulk change, so the old selection doesn't linger.
+        generation = st.session_state.get('admin_table_generation', 0)
+        event = st.dataframe(
+            frame,
+            column_config=TABLE_COLUMN_CONFIG,
+            hide_index=True,
+            use_container_width=True,
+            on_select="rerun",
+            selection_mode="multi-row" if bulk else "single-row",
+            key=f"admin_services_table_{generation}",
+        )
+        if bulk:
+            page_ids = frame["Service ID"].tolist()
+            self.bulk_actions_bar([int(page_ids[i]) for i in event.selection.rows])
+        elif event.selection.rows:
+            st.session_state['current_service'] = int(frame.iloc[event.selection.rows[0]]["Service ID"])
+            st.session_state['admin_table_generation'] = generation + 1
+            st.rerun()
+
+    def bulk_actions_bar(self, service_ids):
+        col1, col2, col3 = st.columns([1, 2, 1])
+        with col1:
+            action = st.selectbox("Bulk action", BULK_ACTIONS, key="bulk_action")
+        with col2:
+            if action == "Set status":
+                st.selectbox("New status", STATUS_OPTIONS, key="bulk_status")
+            elif action == "Assign mechanic":
+                st.selectbox(
+                    "Mechanic", [None] + list(self.mechanic_options.keys()), key="bulk_mechanic",
+                    format_func=lambda mid: "None" if mid is None else self.mechanic_options.get(mid, "Unknown"),
+                )
+        with col3:
+            st.button(
+                f"Apply to {len(service_ids)} selected", key="bulk_apply", disabled=not service_ids,
+                on_click=self._apply_bulk, args=(action, service_ids),
+            )
+        self._show_flash("bulk")
+
+    def _apply_bulk(self, action, service_ids):
+        # Status actions only move open services; completed or cancelled ones are skipped.
+        skip_statuses = CLOSED_STATUSES
+        if action == "Set status":
+            fields = {"status": st.session_state["bulk_status"]}
+        elif action == "Assign mechanic":
+            fields = {"assigned_mechanic": st.session_state["bulk_mechanic"]}
+            skip_statuses = ()
+        else:
+            fields = {"status": "Cancelled"}
+        result = DBServiceManager().bulk_update_services(service_ids, fields, skip_statuses=skip_statuses)
+        if result is None:
+            flash = ("error", "Failed to update services.")
+        else:
+            message = f"{action}: {result.touched} services updated"
+            if result.skipped:
+                reason = "closed or unchanged" if skip_statuses else "unchanged"
+                message += f", {len(result.skipped)} skipped ({reason})"
+            flash = ("success", message + ".")
+            st.session_state['admin_table_generation'] = st.session_state.get('admin_table_generation', 0) + 1
+        st.session_state["admin_flash_bulk"] = flash
+
     def show_service_detail_page(self, service_id):
         service = self.service_manager.get_by_id(service_id)
         if not service:
@@ -297,86 +517,271 @@ class AdminDashboard:
 
         col1, col2 = st.columns(2)
         with col1:
-            st.subheader("📊 Status")
-            status_options = ["Pending", "In Progress", "Completed", "Cancelled"]
-            curr_status = service.status
-            new_status = st.selectbox(
-                "Service Status",
-                status_options,
-                index=status_options.index(curr_status) if curr_status in status_options else 0
-            )
-            if st.button("Update Status"):
-                service.update_status(new_status)
-                self.service_manager.save()
-                st.success("Status updated successfully.")
-                st.rerun()
-
+            self.status_panel(service_id)
         with col2:
-            st.subheader("🔧 Assign Mechanic")
-            mech_keys = [None] + list(self.mechanic_options.keys())
-
-            def mech_name_or_none(mid):
-                return "None" if mid is None else self.mechanic_options.get(mid, "Unknown")
-
-            curr_mech_id = service.assigned_mechanic
-            mech_default = 0
-            if curr_mech_id in self.mechanic_options:
-                mech_default = mech_keys.index(curr_mech_id)
-            selected_mech = st.selectbox(
-                "Mechanic", mech_keys, format_func=mech_name_or_none, index=mech_default
-            )
-            if st.button("Assign Mechanic"):
-                service.assign_mechanic(selected_mech)
-                self.service_manager.save()
-                st.success("Mechanic assigned successfully")
-                st.rerun()
+            self.mechanic_panel(service_id)
         st.markdown("---")
+        self.charges_panel(service_id)
+        st.markdown("---")
+        self.work_description_panel(service_id)
+
+    # Each editor panel is a fragment: its button reruns only the panel. The on_click handler
+    # saves just this service, conditional on the version the panel was rendered from, and
+    # only a conflicting row is re-read from the DB.
+
+    def _apply(self, panel, service_id, change, message, widget_keys=()):
+        service = self.service_manager.get_by_id(service_id)
+        if not service:
+            return
+        change(service)
+        result = self.service_manager.save(notify=False)
+        if result is None:
+            flash = ("error", "Failed to save service.")
+        elif service_id in result.conflicts:
+            # Drop the stale inputs so the panel shows the reloaded values.
+            for key in widget_keys:
+                st.session_state.pop(key, None)
+            flash = ("warning", "⚠️ Someone else changed this service. Reloaded the latest version; "
+                                "please re-apply your change.")
+        else:
+            flash = ("success", message)
+        st.session_state[f"admin_flash_{panel}"] = flash
+
+    @staticmethod
+    def _show_flash(panel):
+        flash = st.session_state.pop(f"admin_flash_{panel}", None)
+        if flash:
+            display_alert(flash[1], flash[0])
+
+    @st.fragment
+    def status_panel(self, service_id):
+        service = self.service_manager.get_by_id(service_id)
+        if not service:
+            return
+        st.subheader("📊 Status")
+        curr_status = service.status
+        key = f"status_{service_id}"
+        st.selectbox(
+            "Service Status",
+            STATUS_OPTIONS,
+            index=STATUS_OPTIONS.index(curr_status) if curr_status in STATUS_OPTIONS else 0,
+            key=key
+        )
+        st.button("Update Status", on_click=self._apply, args=(
+            "status", service_id,
+            lambda srv: srv.update_status(st.session_state[key]),
+            "Status updated successfully.", (key,)
+        ))
+        self._show_flash("status")
+
+    @st.fragment
+    def mechanic_panel(self, service_id):
+        service = self.service_manager.get_by_id(service_id)
+        if not service:
+            return
+        st.subheader("🔧 Assign Mechanic")
+        mech_keys = [None] + list(self.mechanic_options.keys())
+
+        def mech_name_or_none(mid):
+            return "None" if mid is None else self.mechanic_options.get(mid, "Unknown")
+
+        curr_mech_id = service.assigned_mechanic
+        mech_default = 0
+        if curr_mech_id in self.mechanic_options:
+            mech_default = mech_keys.index(curr_mech_id)
+        key = f"mechanic_{service_id}"
+        st.selectbox(
+            "Mechanic", mech_keys, format_func=mech_name_or_none, index=mech_default, key=key
+        )
+        st.button("Assign Mechanic", on_click=self._apply, args=(
+            "mechanic", service_id,
+            lambda srv: srv.assign_mechanic(st.session_state[key]),
+            "Mechanic assigned successfully", (key,)
+        ))
+        self._show_flash("mechanic")
+
+    @st.fragment
+    def charges_panel(self, service_id):
+        """Extra charges editor and the payment summary it affects, rerun together."""
+        service = self.service_manager.get_by_id(service_id)
+        if not service:
+            return
+        d = service.data
         col1, col2 = st.columns(2)
         with col1:
             st.subheader("💸 Extra Charges")
-            new_extra = st.number_input(
-                "Extra Charges (₹)", min_value=0, value=service.extra_charges, step=10
+            extra_key, desc_key = f"extra_{service_id}", f"extra_desc_{service_id}"
+            st.number_input(
+                "Extra Charges (₹)", min_value=0, value=service.extra_charges, step=10, key=extra_key
             )
-            charge_desc = st.text_input("Description for Extra Charges", value=service.charge_description)
-            if st.button("Update Extra Charges"):
-                service.add_extra_charges(new_extra, charge_desc)
-                self.service_manager.save()
-                st.success("Extra charges updated")
-                st.rerun()
-        
+            st.text_input("Description for Extra Charges", value=service.charge_description, key=desc_key)
+            st.button("Update Extra Charges", on_click=self._apply, args=(
+                "charges", service_id,
+                lambda srv: srv.add_extra_charges(st.session_state[extra_key], st.session_state[desc_key]),
+                "Extra charges updated", (extra_key, desc_key)
+            ))
+            self._show_flash("charges")
+
         with col2:
-            st.subheader("📝 Work Description")
-            work_done = st.text_area("Work Done Description", value=d.get("work_done", ""), height=100)
-            if st.button("Save Work Description"):
-                service.save_work_description(work_done)
-                self.service_manager.save()
-                st.success("Work description saved")
-                st.rerun()
+            st.subheader("💳 Payment Information")
+            payment_status = d.get("payment_status", "Pending")
+            base = d.get('base_cost', 0) or 0
+            extra = d.get('extra_charges', 0) or 0
+            paid_amt = d.get("Paid",0) or 0
+            total = base + extra
+            st.write(f"**Base Cost:** ₹{base}")
+            st.write(f"**Extra Charges:** ₹{extra}")
+            st.write(f"**Total Cost:** ₹{total}")
+            st.write(f"**Paid Amount:** ₹{paid_amt}")
+            st.write(f"**Payment Status:** {payment_status}")
+
+    @st.fragment
+    def work_description_panel(self, service_id):
+        service = self.service_manager.get_by_id(service_id)
+        if not service:
+            return
+        st.subheader("📝 Work Description")
+        key = f"work_done_{service_id}"
+        st.text_area("Work Done Description", value=service.data.get("work_done", ""), height=100, key=key)
+        st.button("Save Work Description", on_click=self._apply, args=(
+            "work_done", service_id,
+            lambda srv: srv.save_work_description(st.session_state[key]),
+            "Work description saved", (key,)
+        ))
+        self._show_flash("work_done")
+
+    def show_db_metrics(self):
+        with st.expander("📈 Database Metrics", expanded=False):
+            snapshot = metrics.snapshot()
+            if not snapshot:
+                st.info("No database calls recorded yet.")
+                return
+            st.dataframe(snapshot, use_container_width=True, hide_index=True)
+            st.download_button(
+                "⬇️ Download Prometheus metrics",
+                metrics.render_prometheus(),
+                file_name="motormates_metrics.prom",
+                mime="text/plain",
+            )
 
+    @st.fragment
+    def show_auto_assign(self):
+        with st.expander("🤖 Auto-assign Mechanics"):
+            service_date = st.date_input("Service date", value=date.today(), key="assign_date")
+            result = AssignmentService().day_workload(service_date, list(self.mechanic_options))
+            if result is None:
+                return
+            workloads, jobs = result
+            plan, planned = plan_assignments(jobs, workloads)
+            added = {}
+            for mechanic_id in plan.values():
+                added[mechanic_id] = added.get(mechanic_id, 0) + 1
+            st.dataframe(pd.DataFrame({
+                "Mechanic": [self.mechanic_options[m] for m in workloads],
+                "Booked (min)": list(workloads.values()),
+                "New jobs": [added.get(m, 0) for m in workloads],
+                "After (min)": [planned.get(m, load) for m, load in workloads.items()],
+            }), hide_index=True, use_container_width=True)
+            st.write(f"{len(jobs)} unassigned open services on {service_date}.")
+            st.button(
+                f"Assign {len(plan)} services", key="assign_apply", disabled=not plan,
+                on_click=self._apply_assignments, args=(service_date,),
+            )
+            self._show_flash("assign")
+
+    def _apply_assignments(self, service_date):
+        # Re-plan against current data rather than what was on screen.
+        result = AssignmentService().day_workload(service_date, list(self.mechanic_options))
+        assigned = AssignmentService().apply_plan(plan_assignments(result[1], result[0])[0]) if result else None
+        if assigned is None:
+            flash = ("error", "Failed to assign mechanics.")
+        else:
+            flash = ("success", f"Assigned {len(assigned)} services.")
+        st.session_state["admin_flash_assign"] = flash
+
+    @st.fragment
+    def show_trends(self):
         st.markdown("---")
-        st.subheader("💳 Payment Information")
-        payment_status = d.get("payment_status", "Pending")
-        base = d.get('base_cost', 0) or 0
-        extra = d.get('extra_charges', 0) or 0
-        paid_amt = d.get("Paid",0) or 0
-        total = base + extra
-        st.write(f"**Base Cost:** ₹{base}")
-        st.write(f"**Extra Charges:** ₹{extra}")
-        st.write(f"**Total Cost:** ₹{total}")
-        st.write(f"**Paid Amount:** ₹{paid_amt}")
-        st.write(f"**Payment Status:** {payment_status}")
+        st.subheader("📈 Trends")
+        col1, col2, col3 = st.columns(3)
+        with col1:
+            period = st.date_input(
+                "Period", value=(date.today() - timedelta(days=TREND_DAYS - 1), date.today()),
+                key="trend_period"
+            )
+        with col2:
+            breakdown = st.selectbox("Breakdown", list(TREND_BREAKDOWNS), key="trend_breakdown")
+        with col3:
+            measure = st.selectbox("Measure", list(TREND_MEASURES), key="trend_measure")
+        if len(period) != 2:
+            st.info("Pick an end date.")
+            return
+        dimension = TREND_BREAKDOWNS[breakdown]
+        rows = RollupService().daily_trends(period[0], period[1], dimension) or []
+        if not rows:
+            st.info("No services in this period.")
+            return
+        frame = pd.DataFrame(rows)
+        if dimension == "mechanic":
+            frame["bucket"] = [self.mechanic_options.get(m, "Not Assigned") for m in frame["bucket"]]
+        frame["day"] = pd.to_datetime(frame["day"])
+        chart = alt.Chart(frame).mark_bar().encode(
+            x=alt.X("day:T", title="Day"),
+            y=alt.Y(f"sum({TREND_MEASURES[measure]}):Q", title=measure),
+            color=alt.Color("bucket:N", title=breakdown),
+            tooltip=["day:T", alt.Tooltip("bucket:N", title=breakdown),
+                     alt.Tooltip(f"sum({TREND_MEASURES[measure]}):Q", title=measure)],
+        )
+        st.altair_chart(chart, use_container_width=True)
+
+    @st.fragment
+    def show_export(self):
+        with st.expander("📤 Export Services"):
+            col1, col2 = st.columns(2)
+            with col1:
+                default_start = date.today().replace(day=1)
+                period = st.date_input("Requested between", value=(default_start, date.today()), key="export_period")
+            with col2:
+                fmt = st.radio("Format", EXPORT_FORMATS, horizontal=True, key="export_format")
+            if len(period) != 2:
+                st.info("Pick an end date.")
+                return
+            if not st.button("Prepare export", key="export_prepare"):
+                return
+            # Streamed to a temp file and only read back if it is small enough to serve;
+            # on_click="ignore" means downloading doesn't rerun the page and rebuild the export.
+            with tempfile.TemporaryFile() as f:
+                with st.spinner("Exporting services..."):
+                    count = ExportService().export_services(
+                        f, fmt, {"start_date": period[0], "end_date": period[1]}
+                    )
+                if count is None:
+                    return
+                size = f.tell()
+                if size > EXPORT_DOWNLOAD_MAX_BYTES:
+                    st.warning(
+                        f"⚠️ {count} services make a {size / 2**20:.0f} MB file, over the "
+                        f"{EXPORT_DOWNLOAD_MAX_BYTES // 2**20} MB download limit. Pick a shorter period or "
+                        f"run `python -m database.exports --from {period[0]} --to {period[1]} --out FILE`."
+                    )
+                    return
+                f.seek(0)
+                st.success(f"✅ Exported {count} services")
+                st.download_button(
+                    f"⬇️ Download {fmt.upper()}", f.read(), on_click="ignore",
+                    file_name=f"services_{period[0]}_{period[1]}.{fmt}",
+                    mime=EXPORT_MIME_TYPES[fmt],
+                )
 
     def show_statistics_and_logout(self):
         st.markdown("---")
         st.subheader("📊 Quick Statistics")
-        total = len(self.service_manager.services)
-        completed = len([s for s in self.service_manager.services if s.status == "Completed"])
-        pending = len([s for s in self.service_manager.services if s.status == "Pending"])
-        progress = len([s for s in self.service_manager.services if s.status == "In Progress"])
-        revenue = sum(
-            (s.data.get('base_cost', 0) or 0) + (s.data.get('extra_charges', 0) or 0)
-            for s in self.service_manager.services if s.data.get('payment_status') == "Done"
-        )
+        stats = DBServiceManager().get_statistics() or {"total": 0, "by_status": {}, "revenue": 0}
+        total = stats["total"]
+        completed = stats["by_status"].get("Completed", 0)
+        pending = stats["by_status"].get("Pending", 0)
+        progress = stats["by_status"].get("In Progress", 0)
+        revenue = stats["revenue"]
         cols = st.columns(5)
         cols[0].metric("📋 Total Services", total)
         cols[1].metric("✅ Completed", completed)
@@ -47,27 +47,21 @@ class LoginPage:
             st.session_state.login_alert_type = "warning"
             st.rerun()
         else:
-            users = UserService().fetch_all_users()
-            if not users:
-                st.session_state.login_alert_msg = "❌ No users found. Please signup first."
-                st.session_state.login_alert_type = "error"
+            user = UserService().get_user_by_email(email.strip())
+            if user and user["password"] == password:
+                st.session_state.login_alert_msg = None 
+                st.session_state.login_alert_type = None
+                
+                st.session_state.logged_in = True
+                st.session_state.email = user["email"]
+                st.session_state.user_type = user.get("user_type", "Customer")
+                print(f"[LOGIN] {st.session_state.user_type} logged in: {st.session_state.email}")
+                st.session_state.page = "customer_service" if user.get("user_type") == "Customer" else "admin_dashboard"
                 st.rerun()
             else:
-                user = next((u for u in users if u["email"].lower() == email.lower()), None)
-                if user and user["password"] == password:
-                    st.session_state.login_alert_msg = None 
-                    st.session_state.login_alert_type = None
-                    
-                    st.session_state.logged_in = True
-                    st.session_state.email = user["email"]
-                    st.session_state.user_type = user.get("user_type", "Customer")
-                    print(f"[LOGIN] {st.session_state.user_type} logged in: {st.session_state.email}")
-                    st.session_state.page = "customer_service" if user.get("user_type") == "Customer" else "admin_dashboard"
-                    st.rerun()
-                else:
-                    st.session_state.login_alert_msg = "❌ Invalid credentials. Please try again."
-                    st.session_state.login_alert_type = "error"
-                    st.rerun()
+                st.session_state.login_alert_msg = "❌ Invalid credentials. Please try again."
+                st.session_state.login_alert_type = "error"
+                st.rerun()
 
     def action_buttons(self, col):
         with col:
@@ -78,7 +78,7 @@ def book_service_page(user, vehicle_config):
     # Submit service request
     if st.button("Submit Service Request"):
         errors = validate_service_booking_form(
-            vehicle, selected_services, description, pickup_required, pickup_address
+            vehicle, selected_services, pickup_required, pickup_address
         )
         if errors:
             for error in errors:
@@ -102,20 +102,11 @@ def book_service_page(user, vehicle_config):
             "work_done": "",
             "request_date": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
         }
-        service_id = ServiceManager().save_service(new_service)
-
-        if service_id:
-            # Save individual service types
-            for svc in selected_services:
-                service_type_data = {
-                    'service_id': service_id,
-                    'service_name': svc,
-                    'price': SERVICE_PRICES.get(svc, 0)
-                }
-                sm = ServiceManager()
-                service_type_id = sm.save_service_type(service_type_data)
-                if not service_type_id:
-                    display_alert(f"❌ Failed to save service type '{svc}'", "error")
+        line_items = [
+            {'service_name': svc, 'price': SERVICE_PRICES.get(svc, 0)}
+            for svc in selected_services
+        ]
+        service_id = ServiceManager().create_booking(new_service, line_items)
 
         if service_id:
             st.session_state["booking_service_id"] = service_id
@@ -127,7 +118,7 @@ def book_service_page(user, vehicle_config):
 
 def show_service_detail_and_payment(service_id):
     """Display service details and handle payment"""
-    service = ServiceManager().get_services_by_customer_id(service_id)
+    service = ServiceManager().get_service(service_id)
     if not service:
         st.error("❌ Service record not found.")
         if "booking_service_id" in st.session_state:
@@ -156,8 +147,10 @@ def show_service_detail_and_payment(service_id):
     st.write(f"**Payment Status:** {service.get('payment_status')}")
 
     # Payment button
-    if st.button(f"💳 Pay ₹{base_cost} Now"):
-        success = PaymentService().update_payment_status(service_id, base_cost)
+    if st.button(f"💳 Pay ₹{base_cost} Now", key=f"pay_{service_id}_v{service.get('version')}"):
+        success = PaymentService().update_payment_status(
+            service_id, base_cost, expected_version=service.get('version')
+        )
         if success:
             display_alert("✅ Payment successful!", "success")
             if "booking_service_id" in st.session_state:
@@ -55,9 +55,7 @@ class CustomerDashboard:
 
 def main():
     global_css()
-    users = UserService().fetch_all_users()
-    email = st.session_state.get("email")
-    user_data = next((u for u in users if u["email"] == email), None)
+    user_data = UserService().get_session_user(st.session_state.get("email"))
     if not user_data:
         st.error("User not found. Please log in again.")
         return
@@ -75,11 +75,7 @@ class ForgotPasswordFlow:
                 if not email_lc or not phone_str:
                     display_alert("⚠️ Please enter both email and phone number", "error")
                 else:
-                    users = UserService.fetch_all_users()
-                    user = next(
-                        (u for u in users if u.get("email", "").lower() == email_lc and u.get("phone", "") == phone_str),
-                        None
-                    )
+                    user = UserService().get_user_by_email_and_phone(email_lc, phone_str)
                     if user:
                         st.session_state.fp_user_data = {
                             "email": email_lc,
@@ -125,22 +121,16 @@ class ForgotPasswordFlow:
                 if not valid:
                     display_alert(message, "error")
                 else:
-                    users = UserService.fetch_all_users()
-                    updated = False
-                    for i, user in enumerate(users):
-                        if (
-                            user.get("email", "").lower() == st.session_state.fp_user_data["email"]
-                            and user.get("phone") == st.session_state.fp_user_data["phone"]
-                        ):
-                            users[i]["password"] = new_password
-                            updated = True
-                            break
+                    updated = UserService().update_password(
+                        st.session_state.fp_user_data["email"],
+                        st.session_state.fp_user_data["phone"],
+                        new_password
+                    )
                     if updated:
-                        UserService.add_user(users)
                         st.session_state.fp_step = 3
                         display_alert("🎉 Password reset successful!", "success")
                         st.balloons()
-                        st.experimental_rerun()
+                        st.rerun()
                     else:
                         display_alert("❌ Error updating password. Please try again.", "error")
 
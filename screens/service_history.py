@@ -1,5 +1,6 @@
 import streamlit as st
 from utils import display_alert
+from database.cache import query_cache
 from database.services import ServiceManager
 from database.payments import PaymentService
 
@@ -54,16 +55,14 @@ def _display_service_details(service, total_cost, paid_amount, remaining_amount,
 def _display_payment_section(service, payment_status, remaining_amount):
     """Handle payment display and processing"""
     service_id = service['service_id']
+    refused = st.session_state.pop(f"history_pay_refused_{service_id}", None)
+    if refused:
+        display_alert(refused, "warning")
     
     if payment_status == "Pending" and remaining_amount > 0:
         # Show payment button for pending payments
-        if st.button(f"💳 Pay ₹{remaining_amount} Now", key=f"pay_{service_id}"):
-            success = PaymentService().update_payment_status(service_id, remaining_amount)
-            if success:
-                display_alert("✅ Payment successful!", "success")
-                st.rerun()
-            else:
-                display_alert("❌ Payment failed. Please try again.", "error")
+        if st.button(f"💳 Pay ₹{remaining_amount} Now", key=f"pay_{service_id}_v{service.get('version')}"):
+            _pay(service, remaining_amount, "✅ Payment successful!")
     
     elif payment_status == "Done":
         # Show completed payment status
@@ -72,29 +71,43 @@ def _display_payment_section(service, payment_status, remaining_amount):
     elif payment_status == "Partial":
         # Show partial payment status (if applicable)
         st.warning(f"⚠️ Partial Payment - Remaining: ₹{remaining_amount}")
-        if st.button(f"💳 Pay Remaining ₹{remaining_amount}", key=f"pay_remaining_{service_id}"):
-            success = PaymentService().update_payment_status(service_id, remaining_amount)
-            if success:
-                display_alert("✅ Payment completed!", "success")
-                st.rerun()
-            else:
-                display_alert("❌ Payment failed. Please try again.", "error")
+        if st.button(f"💳 Pay Remaining ₹{remaining_amount}", key=f"pay_remaining_{service_id}_v{service.get('version')}"):
+            _pay(service, remaining_amount, "✅ Payment completed!")
+
+
+def _pay(service, amount, success_message):
+    """Pay amount for the service as displayed; refused if it changed since it was loaded.
+
+    The pay buttons' keys include the version too, so a click on a stale render is dropped.
+    A refused payment reruns the page with the service re-read from the DB.
+    """
+    success = PaymentService().update_payment_status(
+        service['service_id'], amount, expected_version=service.get('version')
+    )
+    if success:
+        display_alert(success_message, "success")
+        st.rerun()
+    else:
+        # Another session or process changed it; drop our cached copies so the rerun
+        # shows the current amount and the pay button carries the current version.
+        query_cache.invalidate("services")
+        st.session_state[f"history_pay_refused_{service['service_id']}"] = (
+            "⚠️ Payment not taken: this service was just updated (e.g. extra charges added). "
+            "Please review the new amount."
+        )
+        st.rerun()
+
+
+HISTORY_PAGE_SIZES = [10, 25, 50]
 
 
 def service_history_page_with_summary(user):
     """Service history page with summary statistics"""
     st.header("📋 My Service History")
     
-    # Then display detailed history
-    services = ServiceManager().get_services_by_customer_id(user.id)
-    
-    if not services:
-        st.info("No service history found.")
-        return
-    
     # Filter options
     with st.expander("🔍 Filter Options", expanded=False):
-        col1, col2 = st.columns(2)
+        col1, col2, col3 = st.columns(3)
         
         with col1:
             status_filter = st.selectbox(
@@ -107,33 +120,80 @@ def service_history_page_with_summary(user):
                 "Filter by Payment", 
                 ["All", "Pending", "Done", "Partial"]
             )
-    
-    # Apply filters
-    filtered_services = services
-    if status_filter != "All":
-        filtered_services = [s for s in filtered_services if s.get('status') == status_filter]
-    if payment_filter != "All":
-        filtered_services = [s for s in filtered_services if s.get('payment_status') == payment_filter]
-    
-    if not filtered_services:
-        st.info(f"No services found matching the selected filters.")
+
+        with col3:
+            page_size = st.selectbox("Services per page", HISTORY_PAGE_SIZES)
+    
+    # Filters are applied in SQL; reset paging whenever they change
+    filters = {
+        "statuses": [] if status_filter == "All" else [status_filter],
+        "payment_statuses": [] if payment_filter == "All" else [payment_filter],
+    }
+    signature = (user.id, status_filter, payment_filter, page_size)
+    if st.session_state.get("history_page_signature") != signature:
+        st.session_state["history_page_signature"] = signature
+        st.session_state["history_page_cursors"] = [None]
+    cursors = st.session_state["history_page_cursors"]
+    open_ids = st.session_state.setdefault("history_open_ids", set())
+
+    result = ServiceManager().query_customer_services(
+        user.id, filters, after_cursor=cursors[-1], limit=page_size
+    )
+    services, next_cursor = result if result else ([], None)
+
+    if not services and len(cursors) > 1:
+        # The page emptied under us (rows changed or were removed); start again from page 1.
+        st.session_state["history_page_cursors"] = [None]
+        st.rerun()
+
+    if not services:
+        if status_filter == "All" and payment_filter == "All" and len(cursors) == 1:
+            st.info("No service history found.")
+        else:
+            st.info(f"No services found matching the selected filters.")
         return
     
-    st.write(f"Showing {len(filtered_services)} of {len(services)} services")
+    st.write(f"Page {len(cursors)} · showing {len(services)} services")
     
-    # Display filtered services
-    for service in filtered_services:
-        extra_charge = service.get("extra_charges", 0)
-        total_cost = service.get("base_cost", 0) + extra_charge
+    # Display one summary line per service; details are fetched only when opened
+    for service in services:
+        service_id = service['service_id']
+        total_cost = (service.get("base_cost") or 0) + (service.get("extra_charges") or 0)
         payment_status = service.get("payment_status", "Pending")
-        paid_amount = service.get("Paid", 0)
-        remaining_amount = total_cost - paid_amount
         
-        expanded_title = (
-            f"Service #{service['service_id']} - {service.get('vehicle_no', 'N/A')} "
+        title = (
+            f"Service #{service_id} - {service.get('vehicle_no', 'N/A')} "
             f"- Status: {service.get('status', 'Unknown')} - "
             f"Payment: {payment_status} - Total: ₹{total_cost}"
         )
-        
-        with st.expander(expanded_title, expanded=False):
-            _display_service_details(service, total_cost, paid_amount, remaining_amount, payment_status)
\ No newline at end of file
+        is_open = service_id in open_ids
+        if st.button(f"{'▼' if is_open else '▶'} {title}", key=f"history_toggle_{service_id}", use_container_width=True):
+            open_ids.symmetric_difference_update({service_id})
+            st.rerun()
+        if is_open:
+            _display_service_row(service_id, user)
+
+    col1, col2, col3 = st.columns([1, 2, 1])
+    with col1:
+        if st.button("⬅️ Previous", key="history_prev", disabled=len(cursors) <= 1):
+            cursors.pop()
+            st.rerun()
+    with col3:
+        if st.button("Next ➡️", key="history_next", disabled=next_cursor is None):
+            cursors.append(next_cursor)
+            st.rerun()
+
+
+def _display_service_row(service_id, user):
+    """Load one service's full record and render its details."""
+    service = ServiceManager().get_service(service_id)
+    if not service or service.get("customer_id") != user.id:
+        st.error("❌ Service record not found.")
+        return
+    extra_charge = service.get("extra_charges", 0) or 0
+    total_cost = (service.get("base_cost", 0) or 0) + extra_charge
+    payment_status = service.get("payment_status", "Pending")
+    paid_amount = service.get("Paid", 0) or 0
+    remaining_amount = total_cost - paid_amount
+    with st.container(border=True):
+        _display_service_details(service, total_cost, paid_amount, remaining_amount, payment_status)
@@ -40,10 +40,10 @@ class SignUpPage:
 
     @staticmethod
     def check_existing_users(full_name, email, phone):
-        users = UserService().fetch_all_users()
-        if any(u["full_name"].lower() == full_name.lower() for u in users):
+        users = UserService().find_conflicting_users(full_name.strip(), email.lower().strip(), phone) or []
+        if any(u["full_name"].lower() == full_name.strip().lower() for u in users):
             return False, "❌ Full name already exists. Please choose another."
-        if any(u["email"].lower() == email.lower() for u in users):
+        if any(u["email"].lower() == email.lower().strip() for u in users):
             return False, "❌ Email already registered. Please login or use another."
         if any(u["phone"] == phone for u in users):
             return False, "❌ Phone already registered. Please use another."
@@ -1,19 +1,85 @@
 import streamlit as st
 import base64
+import io
+import mimetypes
 import os
+from functools import lru_cache
+
+STATIC_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "static")
+BACKGROUND_MAX_WIDTH = 1920
+BACKGROUND_WEBP_QUALITY = 80
+
+
+def _webp_variant(path, max_width=BACKGROUND_MAX_WIDTH, quality=BACKGROUND_WEBP_QUALITY):
+    """Return a resized WebP encoding of the image, or None if Pillow can't produce one."""
+    try:
+        from PIL import Image
+        with Image.open(path) as img:
+            if img.width > max_width:
+                img = img.resize((max_width, round(img.height * max_width / img.width)))
+            buf = io.BytesIO()
+            img.save(buf, format="WEBP", quality=quality, method=6)
+            return buf.getvalue()
+    except Exception as e:
+        print(f"[ASSET] WebP conversion skipped for {path}: {e}")
+        return None
+
+
+@lru_cache(maxsize=None)
+def background_image_url(filename, static_serving=False):
+    """CSS url() target for a file in static/, computed once per process.
+
+    A resized WebP copy is written next to the original on first use. With
+    server.enableStaticServing the page references that file by URL;
+    otherwise its bytes are inlined as a data URI. Returns None if the image
+    is missing.
+    """
+    path = os.path.join(STATIC_DIR, filename)
+    if not os.path.exists(path):
+        return None
+    webp_name = f"{os.path.splitext(filename)[0]}.w{BACKGROUND_MAX_WIDTH}.webp"
+    webp_path = os.path.join(STATIC_DIR, webp_name)
+
+    have_variant = os.path.exists(webp_path) and os.path.getmtime(webp_path) >= os.path.getmtime(path)
+    if have_variant:
+        with open(webp_path, "rb") as f:
+            data = f.read()
+    else:
+        data = _webp_variant(path)
+        if data:
+            try:
+                with open(webp_path, "wb") as f:
+                    f.write(data)
+                have_variant = True
+            except OSError as e:
+                print(f"[ASSET] Could not write {webp_path}: {e}")
+
+    if static_serving:
+        return f"app/static/{webp_name if have_variant else filename}"
+    if data:
+        return f"data:image/webp;base64,{base64.b64encode(data).decode()}"
+    with open(path, "rb") as f:
+        mime = mimetypes.guess_type(path)[0] or "image/png"
+        return f"data:{mime};base64,{base64.b64encode(f.read()).decode()}"
+
+
+def _static_serving_enabled():
+    try:
+        return bool(st.get_option("server.enableStaticServing"))
+    except Exception:
+        return False
+
 
 def set_home_background():
-    image_path = "static/home_bg_image.png"
+    image_name = "home_bg_image.png"
     try:
-        if os.path.exists(image_path):
-            with open(image_path, "rb") as img_file:
-                b64_string = base64.b64encode(img_file.read()).decode()
-            
+        bg_url = background_image_url(image_name, _static_serving_enabled())
+        if bg_url:
             st.markdown(
                 f"""
                 <style>
                 .stApp {{
-                    background-image: url("data:image/webp;base64,{b64_string}");
+                    background-image: url("{bg_url}");
                     background-size: 100% 100%;
                     background-position: center top;
                     background-repeat: no-repeat;
@@ -115,24 +181,22 @@ def set_home_background():
                 unsafe_allow_html=True
             )
         else:
-            st.warning(f"Background image '{image_path}' not found!")
+            st.warning(f"Background image 'static/{image_name}' not found!")
     except Exception as e:
         st.error(f"Error loading background image: {str(e)}")
 
 def global_css():
-    image_path= r"static\bg_image.jpg"
-    def _encode_image(path):
-        if os.path.exists(path):
-            with open(path, "rb") as f:
-                return base64.b64encode(f.read()).decode()
-        return None
+    st.markdown(_global_css_block(_static_serving_enabled()), unsafe_allow_html=True)
+
 
-    b64 = _encode_image(image_path)
+@lru_cache(maxsize=None)
+def _global_css_block(static_serving):
+    bg_url = background_image_url("bg_image.jpg", static_serving)
     bg_css = ""
-    if b64:
+    if bg_url:
         bg_css = f"""
             .stApp {{
-                background-image: url("data:image/png;base64,{b64}") !important;
+                background-image: url("{bg_url}") !important;
                 background-size: cover !important;
                 background-position: center center !important;
                 background-repeat: no-repeat !important;
@@ -275,7 +339,7 @@ def global_css():
         }
     """
 
-    st.markdown(f"<style>{bg_css}{custom_class_css}{common_css}</style>", unsafe_allow_html=True)
+    return f"<style>{bg_css}{custom_class_css}{common_css}</style>"
 
 
 def display_password_requirements(password: str):